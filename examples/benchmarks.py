@@ -0,0 +1,1027 @@
+#!/usr/bin/env python
+# coding: utf-8
+# vim:et:sta:sts=2:sw=2:ts=2:tw=0:
+"""
+Benchmarks of urwidm, run without a terminal.
+Usage: benchmarks.py [name ...]
+"""
+from __future__ import division, unicode_literals, print_function, absolute_import
+
+import gc
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+import urwidm
+from urwidm import fake_display, replay
+from urwidm.damage import DamageTracker
+from urwidm.futures import UIDispatcher, in_thread
+from urwidm.theme import ThemeRegistry
+urwidm.set_encoding('utf8')
+
+
+def bench_attrs():
+  """ Attribute-map dicts allocated when rendering a 1000-widget form from scratch. """
+  n = 1000
+  pile = urwidm.PileMore([urwidm.EditMore("field {0}: ".format(i)) for i in range(n)])
+  size = (80,)
+  pile.render(size)
+  urwidm.CanvasCache.clear()
+  start = time.time()
+  canvas = pile.render(size)
+  elapsed = time.time() - start
+  objs = reachable([canvas])
+  attr_maps = set(id(cv[4]) for num_rows, cviews in canvas.shards for cv in cviews)
+  # attributes made on the fly (one per row, per status...) do not fill the interned attributes
+  shared = urwidm.intern_attr('body')
+  for i in range(100000):
+    urwidm.intern_attr(('row {0}'.format(i), 'body'))
+    if i % 100 == 0:
+      assert urwidm.intern_attr('body') is shared
+  assert len(urwidm.widget._interned_attrs) + len(urwidm.widget._interned_old) <= 2 * urwidm.widget._interned_size
+  print("attrs: {0} widgets rendered in {1:.3f}ms, canvas of {2} dicts and {3} bytes, {4} distinct attribute maps".format(
+    n, 1000 * elapsed, sum(1 for o in objs if type(o) is dict), sum(sys.getsizeof(o) for o in objs), len(attr_maps)))
+
+
+def bench_bulk():
+  """ Rebuild a pile of 2000 rows, the focus on its first row, keeping it valid after each change or through a bulk update. """
+  n = 2000
+  size = (80, 24)
+  events = []
+
+  def on_focus(widget):
+    events.append(widget)
+    sum(range(2000))  # like a handler validating the field
+    return True
+
+  def fields(label):
+    edits = [urwidm.EditMore("{0} {1}: ".format(label, i)) for i in range(n)]
+    for edit in edits:
+      urwidm.connect_signal(edit, 'focusgain', on_focus)
+      urwidm.connect_signal(edit, 'focuslost', on_focus)
+    return edits
+  results = []
+  gc.disable()  # the collections of the old rows would be counted in the next pass
+  try:
+    for bulk in (False, True):
+      pile = urwidm.PileMore(fields("old"))
+      frame = urwidm.FrameMore(urwidm.FillerMore(pile, 'top'))
+      ring = urwidm.FocusRing(frame)
+      pile.gain_focus()
+      frame.render(size, True)
+      rows = fields("new")
+      del events[:]
+      start = time.time()
+      if bulk:
+        with pile.bulk_update() as update:
+          update.clear()
+          for row in rows:
+            update.append(row)
+      else:
+        for row in rows:
+          pile.widget_list.append(row)
+          pile.item_types.append(('weight', 1))
+        while len(pile.widget_list) > n:
+          if pile.focus_item is pile.widget_list[0]:
+            pile.set_focus(1)  # the row in focus is going away
+          del pile.widget_list[0]
+          del pile.item_types[0]
+      elapsed = time.time() - start
+      start = time.time()
+      canvas = frame.render(size, True)
+      results.append((elapsed, len(events), time.time() - start))
+      assert pile.get_focus() is rows[0] and canvas.text[0].startswith(b"new 0: ")
+      assert ring.move(1) and pile.get_focus() is rows[1]
+  finally:
+    gc.enable()
+  assert results[1][1] == 2
+  # the focus stays on a widget still there, only the net change emits events
+  columns = urwidm.ColumnsMore(fields("column")[:4])
+  columns.gain_focus()
+  columns.set_focus(2)
+  kept = columns.get_focus()
+  del events[:]
+  with columns.bulk_update() as update:
+    update.remove(0)
+    update.insert(0, urwidm.TextMore("label"), ('fixed', 5))
+    update.replace(3, urwidm.EditMore("other"))
+  assert columns.get_focus() is kept and columns.focus_col == 2 and not events
+  with columns.bulk_update() as update:
+    update.remove(kept)
+    update.set_focus(1)
+  assert columns.focus_col == 1 and events == [kept, columns.get_focus()]
+  # a failed update leaves the container as it was
+  widgets = list(columns.widget_list)
+  del events[:]
+  try:
+    with columns.bulk_update() as update:
+      update.clear()
+      update.append(urwidm.EditMore("half done"))
+      raise ValueError()
+  except ValueError:
+    pass
+  assert list(columns.widget_list) == widgets and len(columns.column_types) == len(widgets) and columns.focus_col == 1 and not events
+  # a removed widget refusing to loose the focus looses it, a widget refusing to gain it is passed over
+  refusing = [urwidm.EditMore("refusing"), columns.get_focus()]
+  accepting = urwidm.EditMore("accepting")
+  for edit in refusing:
+    urwidm.connect_signal(edit, 'focusgain', lambda w: False)
+    urwidm.connect_signal(edit, 'focuslost', lambda w: False)
+  with columns.bulk_update() as update:
+    update.replace(2, refusing[0])
+    update.append(accepting)
+  assert columns.get_focus() is refusing[1] and refusing[1].has_focus
+  with columns.bulk_update() as update:
+    update.remove(refusing[1])
+  assert columns.get_focus() is accepting and accepting.has_focus and not refusing[0].has_focus and not refusing[1].has_focus
+  print("bulk: {0} rows replaced with a valid pile after each change in {1:.1f}ms with {2} focus events, "
+        "in a bulk update in {3:.1f}ms with {4}; the new rows then rendered in {5:.0f}ms and {6:.0f}ms".format(
+          n, 1000 * results[0][0], results[0][1], 1000 * results[1][0], results[1][1], 1000 * results[0][2], 1000 * results[1][2]))
+
+
+def bench_combo():
+  """ Rapid selections in a ComboBox whose change handler is slow, debounced and run in a thread, and reopenings of its popup. """
+  checked = []
+
+  def slow_check(combo, text, pos):
+    checked.append(text)
+    time.sleep(0.1)
+    return text != 'forbidden'
+  combo = urwidm.ComboBox("Choice", ['first', 'second', 'third', 'forbidden'])
+  combo.change_debounce = 0.05
+  urwidm.connect_signal(combo, 'change', in_thread(slow_check))
+  start = time.time()
+  for pos in (1, 2, 3, 1, 2, 3):
+    combo.change_selection(pos)
+  elapsed = time.time() - start
+  assert combo.selected_item == ('forbidden', 3)  # optimistic
+  while combo._pending_change:
+    time.sleep(0.01)
+    UIDispatcher.poll()
+  assert checked == ['forbidden'] and combo.selected_item == ('first', 0)  # rolled back
+  print("combo: 6 selections in {0:.3f}ms, 1 handler call, rolled back after {1:.3f}s".format(1000 * elapsed, time.time() - start))
+  # reopening the same popup, kept between openings or built each time, without rendering it
+  n = 200
+  combo = urwidm.ComboBox("Choice", ["item {0}".format(i) for i in range(100)], focus_index=42)
+  timings = []
+  for rebuild in (True, False):
+    start = time.time()
+    for i in range(n):
+      if rebuild:
+        combo.set_list(combo.list)
+      combo.open_pop_up()
+      popup = combo._pop_up_widget
+      combo.close_pop_up()
+    timings.append((time.time() - start) / n)
+  canvas = popup.render(popup.get_size(), focus=True)
+  assert canvas.rows() == 101 and popup.keypress(popup.get_size(), 'down') is None
+  assert combo.create_pop_up() is popup and popup.selected_pos == 42  # focus back on the selected item
+  combo.list[0] = "new item"
+  assert combo.create_pop_up() is not popup  # item text changed
+  combo.set_combo_attrs('body', 'focus')
+  assert combo.create_pop_up().get_size() == (11, 101)
+  print("combo: reopen of a 100-item popup in {0:.3f}ms, built each time in {1:.3f}ms".format(1000 * timings[1], 1000 * timings[0]))
+
+
+def bench_dialog():
+  """ Throughput of an InputDialog: frames per second, time per keystroke and redundant frames. """
+  n = 500
+  ui = fake_display.Screen((80, 24))
+  for i in range(n):
+    ui.script_input('x')
+  ui.script_input('enter')
+  dialog = urwidm.InputDialog("Type something", 10, 40)
+  start = time.time()
+  exitcode, text = dialog.run(ui, urwidm.SolidFill(' '))
+  elapsed = time.time() - start
+  assert exitcode == 0 and text == 'x' * n
+  print("dialog: {0} keystrokes in {1:.3f}s, {2} frames, {3:.1f} fps, {4:.3f}ms per keystroke, {5} redundant frames".format(
+    n, elapsed, ui.frame_count, ui.fps(), 1000 * sum(ui.keystroke_times) / len(ui.keystroke_times), ui.redundant_frames))
+
+
+def bench_replay():
+  """ Input recorded in a ListBoxMore, a ComboBox popup and an InputDialog, replayed headlessly: latencies and render cost. """
+  size = (80, 24)
+
+  def listbox():
+    listbox = urwidm.ListBoxMore(urwidm.SimpleListWalker([urwidm.ButtonMore("row {0}".format(i)) for i in range(500)]))
+    return listbox, lambda: listbox.get_focus()[1]
+
+  def combo():
+    combo = urwidm.ComboBox("Choice", ["item {0}".format(i) for i in range(50)])
+    return urwidm.FillerMore(urwidm.PileMore([combo]), 'top'), lambda: combo.get_selected_item()
+
+  # a held key is read as one batch of several keys
+  scenarios = [
+    ('listbox', listbox, ['down'] * 20 + [['down'] * 5, 'page down', ['up'] * 3]),
+    ('combo', combo, ['enter', 'down', 'down', ['down'] * 3, 'enter']),
+  ]
+  for name, build, batches in scenarios:
+    recorder = replay.InputRecorder()
+    widget, state = build()
+    ui = fake_display.Screen(size)
+    ui.script_input(*batches)
+    urwidm.MainLoop(widget, screen=ui, input_filter=recorder.input_filter, pop_ups=True).run()
+    recorded = state()
+    events = sum(len(batch) if isinstance(batch, list) else 1 for batch in batches)
+    assert len(recorder.events) == events and len(set(t for t, event in recorder.events)) == len(batches)
+    widget, state = build()
+    replayer = replay.InputReplayer(recorder.events, size)
+    report = replayer.run_loop(urwidm.MainLoop(widget, screen=replayer.screen, pop_ups=True))
+    assert state() == recorded, (name, state(), recorded)
+    # one frame drawn before the input, then one per batch
+    assert report['events'] == events and report['batches'] == len(batches) and report['frames'] == len(batches) + 1, (name, report)
+    assert report['p50'] <= report['p90'] <= report['p99'] <= report['max'] and 0 < report['render_time'] and 0 < report['draw_time']
+    print("replay: {0}: {1} events in {2} batches, p50 {3:.3f}ms, p99 {4:.3f}ms, {5:.3f}ms rendering and {6:.3f}ms drawing {7} frames".format(
+      name, report['events'], report['batches'], 1000 * report['p50'], 1000 * report['p99'],
+      1000 * report['render_time'], 1000 * report['draw_time'], report['frames']))
+  assert recorded == ("item 5", 5)
+  batches = ['a', 'b', ['c', 'd'], 'backspace', 'enter']
+  recorder = replay.InputRecorder()
+  ui = fake_display.Screen(size)
+  ui.script_input(*batches)
+  assert urwidm.InputDialog("Name", 10, 40).run(recorder.wrap_screen(ui), urwidm.SolidFill(' ')) == (0, 'abc')
+  replayer = replay.InputReplayer(recorder.events, size)
+  ret, report = replayer.run_dialog(urwidm.InputDialog("Name", 10, 40), urwidm.SolidFill(' '))
+  # the dialog exits on the last batch, without drawing it
+  assert ret == (0, 'abc') and report['events'] == 6 and report['batches'] == len(batches) - 1 and report['frames'] == len(batches), report
+  assert 0 < report['render_time'] and 0 < report['draw_time']
+  print("replay: dialog: {0} events in {1} batches, p50 {2:.3f}ms, p99 {3:.3f}ms, {4:.3f}ms rendering and {5:.3f}ms drawing {6} frames".format(
+    report['events'], len(batches), 1000 * report['p50'], 1000 * report['p99'],
+    1000 * report['render_time'], 1000 * report['draw_time'], report['frames']))
+
+
+def bench_damage():
+  """ Rows redrawn for keystrokes in a 200-row form, with damage tracking. """
+  n = 200
+  edits = [urwidm.EditMore("field {0:03}: ".format(i)) for i in range(n)]
+  listbox = urwidm.ListBoxMore(urwidm.SimpleListWalker(edits))
+  listbox.set_focus(100)
+  ui = fake_display.Screen((80, n))
+  DamageTracker.enable()
+  try:
+    loop = urwidm.MainLoop(listbox, screen=ui)
+    loop.screen_size = None
+    ui.script_input('x')
+    loop.run()
+    ui.reset_stats()
+    ui.script_input(*['y'] * 50)
+    start = time.time()
+    loop.run()
+    elapsed = time.time() - start
+    # the last keystroke only damaged the row of the focused edit
+    assert DamageTracker.dirty_rows() == [100], DamageTracker.dirty_rows()
+    assert ui.last_frame == fake_display.canvas_to_frame(listbox.render((80, n), True))
+  finally:
+    DamageTracker.enable(False)
+  print("damage: 50 keystrokes in {0:.3f}s, {1} rows redrawn for {2} frames of {3} rows".format(elapsed, ui.redrawn_rows, ui.frame_count, n))
+
+
+def bench_edit():
+  """ Keystrokes in the middle of a 2 MB document: EditMore against BufferEditMore. """
+  text = "\n".join("line {0:05}: {1}".format(i, "lorem ipsum dolor sit amet " * 2) for i in range(30000))
+  size = (80,)
+  states = {}
+  for name, widget, n in (
+    ('EditMore', urwidm.EditMore("", text, multiline=True, edit_pos=len(text) // 2), 5),
+    ('BufferEditMore', urwidm.BufferEditMore("", text, edit_pos=len(text) // 2), 100),
+  ):
+    widget.render(size, True)
+    start = time.time()
+    for i in range(n):
+      widget.keypress(size, 'x')
+      widget.keypress(size, 'down' if i % 2 else 'enter')
+      canvas = widget.render(size, True)
+      if i == 4:
+        states[name] = (widget.edit_text, widget.edit_pos, canvas.cursor, canvas.text)
+    print("edit: {0}: {1:.3f}ms per keystroke".format(name, 1000 * (time.time() - start) / (2 * n)))
+  assert states['BufferEditMore'] == states['EditMore']
+
+
+def bench_updates():
+  """ Stress: 16 worker threads updating texts, a list box and a ComboBox through UIDispatcher. """
+  threads = 16
+  n = 2000
+  labels = [urwidm.TextMore("worker {0}: 0".format(i)) for i in range(threads)]
+  walker = urwidm.SimpleListWalker([])
+  combo = urwidm.ComboBox("last", ["none"])
+  pile = urwidm.PileMore(labels + [combo, urwidm.BoxAdapterMore(urwidm.ListBoxMore(walker), 5)])
+  ui = fake_display.Screen((80, 24))
+  loop = urwidm.MainLoop(urwidm.FillerMore(pile, 'top'), screen=ui)
+
+  def work(i):
+    for j in range(1, n + 1):
+      UIDispatcher.call_soon(labels[i].set_text, "worker {0}: {1}".format(i, j))
+      UIDispatcher.call_soon(walker.append, urwidm.Text("worker {0} line {1}".format(i, j)))
+      if j % 100 == 0:
+        UIDispatcher.call_soon(combo.set_list, ["worker {0}".format(i), "step {0}".format(j)])
+      time.sleep(0.001)  # workers wait on I/O, letting the UI thread run
+
+  def done():
+    raise urwidm.ExitMainLoop()
+  UIDispatcher.attach(loop)
+  workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+  start = time.time()
+  for worker in workers:
+    worker.start()
+  waiter = threading.Thread(target=lambda: [worker.join() for worker in workers] + [UIDispatcher.call_soon(done)])
+  waiter.start()
+  try:
+    loop.run()
+  finally:
+    UIDispatcher.detach()
+  elapsed = time.time() - start
+  updates = threads * n * 2 + threads * n // 100 + 1
+  assert len(walker) == threads * n and [label.text for label in labels] == ["worker {0}: {1}".format(i, n) for i in range(threads)]
+  assert len(combo.list) == 2 and len(UIDispatcher.updates) == 0
+  print("updates: {0} updates from {1} threads in {2:.3f}s, {3:.0f} updates/s, {4} frames".format(
+    updates, threads, elapsed, updates / elapsed, ui.frame_count))
+
+
+def bench_viewer():
+  """ Time to the first frame when viewing a log file: TextDialog (5 MB) against MappedTextDialog (100 MB). """
+  line = "2026-10-19 12:00:00 INFO request handled in 12ms, status 200\n".encode('utf8')
+  fd, path = tempfile.mkstemp()
+  try:
+    with os.fdopen(fd, 'wb') as f:
+      for i in range(100):
+        f.write(b''.join(b'%08d ' % (i * 15000 + j) + line for j in range(15000)))
+    with open(path, 'rb') as f:
+      head = f.read(5 << 20)
+    for name, size, make_dialog in (
+      ('TextDialog', len(head), lambda: urwidm.TextDialog(head.decode('utf8'), 18, 70)),
+      ('MappedTextDialog', os.path.getsize(path), lambda: urwidm.MappedTextDialog(path, 18, 70)),
+    ):
+      ui = fake_display.Screen((80, 24))
+      ui.script_input('enter')
+      start = time.time()
+      dialog = make_dialog()
+      dialog.run(ui, urwidm.SolidFill(' '))
+      print("viewer: {0}: {1:.0f} MB, first frame in {2:.3f}s".format(name, size / (1 << 20), time.time() - start))
+      assert ui.last_frame.text[3].strip('│ ') == '00000000 ' + line.strip().decode('utf8')
+    walker = urwidm.MappedTextWalker(path)
+    start = time.time()
+    while not walker.complete:
+      time.sleep(0.01)
+    print("viewer: {0} lines indexed in the background in {1:.3f}s".format(walker.line_count(), time.time() - start))
+    assert walker.line_count() == 1500000 and walker.get_line(1499999).startswith('01499999 ')
+    walker.close()
+  finally:
+    os.remove(path)
+
+
+def bench_focus():
+  """ Latency of a focus change vetoed by a slow focuslost handler run in a thread. """
+  delay = 0.3
+
+  def slow_check(widget):
+    time.sleep(delay)
+    return False
+  edits = [urwidm.EditMore("field {0}: ".format(i)) for i in range(3)]
+  pile = urwidm.PileMore(edits)
+  pile.gain_focus()
+  handler = in_thread(slow_check)
+  urwidm.connect_signal(edits[0], 'focuslost', handler)
+  events = []
+  for edit in edits[:2]:
+    urwidm.connect_signal(edit, 'focusgain', lambda widget: events.append(('gain', widget)) or True)
+    urwidm.connect_signal(edit, 'focuslost', lambda widget: events.append(('lost', widget)) or True)
+  size = (40,)
+  flags = [edit.has_focus for edit in edits]
+  start = time.time()
+  pile.keypress(size, 'down')
+  elapsed = time.time() - start
+  assert pile.get_focus() is edits[1]  # provisional
+  pile.render(size, focus=True)  # the UI keeps rendering meanwhile
+  while pile.get_focus() is edits[1]:
+    time.sleep(0.01)
+    UIDispatcher.poll()
+  vetoed = time.time() - start
+  assert pile.get_focus() is edits[0] and [edit.has_focus for edit in edits] == flags
+  # the undo is announced like the change was
+  assert events == [('lost', edits[0]), ('gain', edits[1]), ('lost', edits[1]), ('gain', edits[0])], events
+  print("focus: keypress answered in {0:.3f}ms, vetoed by a {1}s handler after {2:.3f}s".format(1000 * elapsed, delay, vetoed))
+  # a handler not answering in time is a veto too
+  urwidm.FocusTransition.timeout = 0.1
+  urwidm.disconnect_signal(edits[0], 'focuslost', handler)
+  urwidm.connect_signal(edits[0], 'focuslost', lambda widget: urwidm.futures.Future())
+  try:
+    pile.keypress(size, 'down')
+    assert pile.get_focus() is edits[1]
+    time.sleep(0.15)
+    UIDispatcher.poll()
+    assert pile.get_focus() is edits[0]
+  finally:
+    urwidm.FocusTransition.timeout = 5.0
+
+
+def bench_repeat():
+  """ A held 'down' key, 30 presses per input batch, through a 600-field form and a 2000-row list, coalesced or not: time to handle a batch. """
+  presses = 30
+  batches = 10
+  events = []
+
+  def on_focus(widget):
+    events.append(widget)
+    sum(range(2000))  # like a handler validating the field
+    return True
+
+  def fields(n, label):
+    edits = [urwidm.EditMore("{0} {1}: ".format(label, i)) for i in range(n)]
+    for edit in edits:
+      urwidm.connect_signal(edit, 'focusgain', on_focus)
+      urwidm.connect_signal(edit, 'focuslost', on_focus)
+    return edits
+  form = urwidm.FrameMore(urwidm.FillerMore(urwidm.PileMore(fields(600, "field")), 'top'))
+  rows = urwidm.FrameMore(urwidm.ListBoxMore(urwidm.SimpleListWalker(fields(2000, "row"))))
+  size = (80, 24)
+  results = []
+  for top in (form, rows):
+    focus = top.body.original_widget if top is form else top.body
+    for coalesce in (False, True):
+      focus.set_focus(0)
+      del events[:]
+      elapsed = 0
+      for batch in range(batches):
+        keys = ['down'] * presses
+        start = time.time()
+        for key in (urwidm.coalesce_keys(keys, top) if coalesce else keys):
+          assert top.keypress(size, key) is None
+        elapsed += time.time() - start
+        top.render(size, focus=True)
+      results.append((elapsed / batches, len(events)))
+      position = focus.get_focus_pos() if top is form else focus.get_focus()[1]
+      assert position == presses * batches, position
+  assert results[1][1] == 2 * batches and results[3][1] == 2 * batches
+  # the presses a widget in focus takes are not coalesced, the ones left move on
+  memo = urwidm.EditMore("memo: ", "1\n2\n3", multiline=True)
+  memo.set_edit_pos(0)
+  grouped = urwidm.PileMore([urwidm.PileMore(fields(2, "a")), memo, urwidm.ColumnsMore(fields(2, "b")), urwidm.PileMore(fields(3, "c"))])
+  assert grouped.keypress((80,), urwidm.RepeatedKey('down', 6)) is None
+  assert grouped.get_focus().get_focus().caption == "c 0: " and memo.edit_text[:memo.edit_pos].count("\n") == 2
+  left = grouped.keypress((80,), urwidm.RepeatedKey('down', 5))
+  assert left == 'down' and left.presses == 3
+  assert urwidm.coalesce_keys(['down', 'down', 'up', 'x', 'down', 'down'], grouped) == [urwidm.RepeatedKey('down', 2), 'up', 'x', 'down', 'down']
+  print("repeat: {0} presses of down through a form of 600 fields in {1:.1f}ms with {2} focus events, coalesced in {3:.1f}ms with {4}; "
+        "through a list of 2000 rows in {5:.1f}ms with {6}, coalesced in {7:.1f}ms with {8}".format(
+          presses, 1000 * results[0][0], results[0][1] // batches, 1000 * results[1][0], results[1][1] // batches,
+          1000 * results[2][0], results[2][1] // batches, 1000 * results[3][0], results[3][1] // batches))
+
+
+def bench_ring():
+  """ Tab through a 1000-row form with a FocusRing, and keep it up to date when the form changes. """
+  n = 1000
+
+  def form_row(i):
+    return urwidm.ColumnsMore([('fixed', 12, urwidm.TextMore("field {0}".format(i))), urwidm.EditMore(), ('fixed', 8, urwidm.CheckBoxMore("on"))], 1)
+
+  def leaves(w):
+    """ The selectable leaves, found by walking the whole tree. """
+    if not getattr(w, 'sensitive', True):
+      return []
+    found = [leaf for subw in urwidm.get_subwidgets(w) for leaf in leaves(subw)]
+    if isinstance(w, urwidm.OverlayMore):
+      found = leaves(w.top_w)
+    return found or ([w] if w.selectable() else [])
+  rows = [form_row(i) for i in range(n)]
+  buttons = urwidm.GridFlowMore([urwidm.ButtonMore("OK"), urwidm.ButtonMore("Cancel")], 10, 2, 0, 'center')
+  pile = urwidm.PileMore(rows)
+  frame = urwidm.FrameMore(urwidm.ListBoxMore(urwidm.SimpleListWalker([pile])), footer=buttons)
+  start = time.time()
+  ring = urwidm.FocusRing(frame)
+  built = time.time() - start
+  assert ring.get_leaves() == leaves(frame) and len(ring.get_leaves()) == 2 * n + 2
+  events = []
+  for w in ring.get_leaves():
+    urwidm.connect_signal(w, 'focusgain', lambda w: events.append(('gain', w)) or True)
+    urwidm.connect_signal(w, 'focuslost', lambda w: events.append(('lost', w)) or True)
+  frame.gain_focus()
+  start = time.time()
+  for i in range(len(ring.get_leaves()) + 1):
+    old = ring.get_focus()
+    del events[:]
+    assert ring.keypress('tab') is None
+    new = ring.get_focus()
+    assert new is ring.get_leaves()[(i + 1) % len(ring.get_leaves())], i
+    # the events are emitted once, by the deepest container changing its focus (none when it has not the focus)
+    assert events in ([], [("lost", old), ("gain", new)]), (i, events)
+  tab = (time.time() - start) / (len(ring.get_leaves()) + 1)
+  assert ring.get_focus() is ring.get_leaves()[1]
+  ring.keypress('shift tab')
+  assert ring.get_focus() is ring.get_leaves()[0]
+  # changes: a row no longer sensitive, rows appended, a field replaced
+  start = time.time()
+  rows[10].set_sensitive(False)
+  pile.widget_list.extend(form_row(n + i) for i in range(10))
+  rows[20].widget_list[1] = urwidm.EditMore("new: ")
+  ring.get_leaves()
+  refreshed = time.time() - start
+  assert ring.get_leaves() == leaves(frame) and len(ring.get_leaves()) == 2 * (n + 10 - 1) + 2
+  frame.set_focus('body')
+  ring.set_focus(rows[500].widget_list[2])
+  assert frame.get_focus() == 'body' and pile.get_focus() is rows[500] and rows[500].get_focus() is rows[500].widget_list[2]
+  # a subtree made sensitive again brings back the leaves disabled one by one inside it
+  rows[30].widget_list[1].set_sensitive(False)
+  assert rows[30].widget_list[1] not in ring.get_leaves()
+  rows[30].set_sensitive_subtree(True)
+  assert ring.get_leaves() == leaves(frame) and rows[30].widget_list[1] in ring.get_leaves()
+  print("ring: {0} fields, built in {1:.1f}ms, {2:.1f}us per Tab, updated in {3:.2f}ms after 3 changes".format(
+    len(ring.get_leaves()), 1000 * built, 1e6 * tab, 1000 * refreshed))
+
+
+def bench_sensitivity():
+  """ Disabling a 500-widget section: widget per widget, as a subtree and inherited. """
+  n = 500
+  size = (80,)
+
+  def section():
+    return urwidm.PileMore([urwidm.ColumnsMore([urwidm.EditMore("edit: "), urwidm.CheckBoxMore("check")]) for i in range(n // 2)])
+
+  def per_widget(pile, state):
+    for columns in pile.widget_list:
+      for w in columns.widget_list:
+        w.set_sensitive(state)
+
+  def subtree(pile, state):
+    pile.set_sensitive_subtree(state)
+
+  def inherited(pile, state):
+    pile.set_sensitive_subtree(state, inherit=True)
+  frames = {}
+  for name, toggle in (('per widget', per_widget), ('subtree', subtree), ('inherited', inherited)):
+    pile = section()
+    pile.render(size)
+    start = time.time()
+    toggle(pile, False)
+    toggled = time.time()
+    canvas = pile.render(size)
+    end = time.time()
+    assert not pile.selectable()
+    frames[name] = fake_display.canvas_to_frame(canvas)
+    toggle(pile, True)
+    assert pile.selectable()
+    print("sensitivity: {0}: disabled in {1:.3f}ms, rendered in {2:.3f}ms".format(name, 1000 * (toggled - start), 1000 * (end - toggled)))
+  assert frames['subtree'] == frames['per widget']
+
+
+def reachable(objs):
+  """ Return objs and all the objects they reference, classes and functions excluded. """
+  skip = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType)
+  seen = {}
+  todo = list(objs)
+  while todo:
+    o = todo.pop()
+    if id(o) in seen or isinstance(o, skip):
+      continue
+    seen[id(o)] = o
+    todo.extend(gc.get_referents(o))
+  return list(seen.values())
+
+
+def bench_tail():
+  """ A log view fed with 10k lines per second at 25 frames per second: SimpleListWalker against TailListWalker. """
+  seconds = 5
+  per_frame = 10000 // 25
+  size = (80, 24)
+  for name in ('SimpleListWalker', 'TailListWalker'):
+    walker = urwidm.SimpleListWalker([]) if name == 'SimpleListWalker' else urwidm.TailListWalker(10000)
+    listbox = urwidm.ListBoxMore(walker)
+    times = []
+    count = 0
+    for frame in range(25 * seconds):
+      start = time.time()
+      if name == 'SimpleListWalker':
+        walker.extend(urwidm.Text("line {0}".format(count + i)) for i in range(per_frame))
+        walker.set_focus(len(walker) - 1)
+      else:
+        for i in range(per_frame):
+          walker.append("line {0}".format(count + i))
+        UIDispatcher.poll()
+      count += per_frame
+      canvas = listbox.render(size)
+      times.append(time.time() - start)
+      if frame == 25 * seconds - 10:
+        listbox.keypress(size, 'up')  # scroll up for the last frames
+        scrolled = listbox.render(size).text
+    assert name == 'SimpleListWalker' or canvas.text == scrolled  # the view did not move
+    times.sort()
+    print("tail: {0}: {1} lines kept, {2:.3f}ms per frame, worst {3:.3f}ms".format(name, len(walker), 1000 * sum(times) / len(times), 1000 * times[-1]))
+  walker.set_focus(walker.first + len(walker) - 1)  # back to the bottom, following again
+  walker.append("last line")
+  UIDispatcher.poll()
+  assert listbox.render(size).text[-1].rstrip() == b"last line"
+
+
+def bench_theme():
+  """ Switching the theme of a 1000-widget form: widget per widget or through the ThemeRegistry. """
+  n = 1000
+  size = (80,)
+  dark = {'focusable': 'dark_focusable', 'focus_edit': 'dark_focus_edit'}
+  ThemeRegistry.register('light', [('focusable', 'black', 'light gray'), ('focus_edit', 'yellow', 'light gray')])
+  ThemeRegistry.register('dark', [('dark_focusable', 'light gray', 'black'), ('dark_focus_edit', 'yellow', 'black')], dark)
+  ui = fake_display.Screen()
+  frames = {}
+  for name in ('per widget', 'theme'):
+    ThemeRegistry.use('light', ui)
+    edits = [urwidm.EditMore("field {0}: ".format(i)) for i in range(n)]
+    pile = urwidm.PileMore(edits)
+    pile.render(size)
+    start = time.time()
+    if name == 'theme':
+      ThemeRegistry.use('dark', ui)
+    else:
+      for edit in edits:
+        edit.set_sensitive_attr((dark['focusable'], dark['focus_edit']))
+    switched = time.time()
+    frames[name] = fake_display.canvas_to_frame(pile.render(size))
+    end = time.time()
+    print("theme: {0}: switched in {1:.3f}ms, redrawn in {2:.3f}ms".format(name, 1000 * (switched - start), 1000 * (end - switched)))
+  assert frames['theme'] == frames['per widget'] and frames['theme'].attrs[1] == [('dark_focusable', 80)]
+  ThemeRegistry.use('light', ui)
+
+
+def deep_sizeof(objs):
+  """ Return the size in bytes of objs and of all the objects they reference, classes and functions excluded. """
+  return sum(sys.getsizeof(o) for o in reachable(objs))
+
+
+def bench_jump():
+  """ Jumps to positions, to keys and to saved scroll states in a list box of a million rows, made when shown. """
+  n = 1000000
+  size = (80, 24)
+  made = []
+
+  def make_row(item):
+    made.append(item)
+    return urwidm.SelText(item)
+  walker = urwidm.IndexedListWalker(["item {0}".format(i) for i in range(n)], make_row)
+  listbox = urwidm.ListBoxMore(walker)
+  canvas = listbox.render(size, True)
+  positions = [(i * 7919 * 7919) % n for i in range(1, 51)]
+  timings = []
+  for jump in (listbox.set_focus, listbox.jump_to):
+    del made[:]
+    start = time.time()
+    for pos in positions:
+      jump(pos)
+      canvas = listbox.render(size, True)
+      assert listbox.get_focus()[1] == pos
+    timings.append(((time.time() - start) / len(positions), len(made) / len(positions)))
+  assert timings[1][1] <= size[1] + 2, timings
+  start = time.time()
+  listbox.jump_to_key("item 123456")
+  indexed = time.time() - start
+  start = time.time()
+  for pos in positions:
+    listbox.jump_to_key("item {0}".format(pos), 'top')
+    canvas = listbox.render(size, True)
+  by_key = (time.time() - start) / len(positions)
+  assert listbox.get_focus()[1] == positions[-1] and canvas.text[0].strip() == "item {0}".format(positions[-1]).encode('utf8')
+  # a view saved, kept as it would in a file, then restored
+  listbox.jump_to(654321)
+  for i in range(3):
+    listbox.keypress(size, 'page down')
+  listbox.keypress(size, 'down')
+  saved = listbox.render(size, True).text
+  state = pickle.loads(pickle.dumps(listbox.get_scroll_state()))
+  listbox.jump_to(12)
+  listbox.render(size, True)
+  start = time.time()
+  listbox.set_scroll_state(state)
+  restored = listbox.render(size, True).text
+  restore = time.time() - start
+  assert restored == saved
+  print("jump: in {0} rows, set_focus in {1:.2f}ms making {2:.0f} rows, jump_to in {3:.2f}ms making {4:.0f}, jump_to_key in {5:.2f}ms "
+        "after a {6:.0f}ms index, scroll state restored in {7:.2f}ms".format(n, 1000 * timings[0][0], timings[0][1], 1000 * timings[1][0],
+                                                                           timings[1][1], 1000 * by_key, 1000 * indexed, 1000 * restore))
+
+
+def bench_memory():
+  """ Bytes per widget for some More widgets. """
+  n = 10000
+  for name, factory in (
+    ('TextMore', lambda i: urwidm.TextMore("text")),
+    ('SelText', lambda i: urwidm.SelText("text")),
+    ('ButtonMore', lambda i: urwidm.ButtonMore("button")),
+    ('CheckBoxMore', lambda i: urwidm.CheckBoxMore("checkbox")),
+  ):
+    widgets = [factory(i) for i in range(n)]
+    print("memory: {0}: {1:.0f} bytes per widget".format(name, (deep_sizeof(widgets) - sys.getsizeof(widgets)) / n))
+
+
+class CountedRow(urwidm.SelText):
+  """ A row counting its renders, the ones not found in the canvas cache. """
+  renders = 0
+
+  def render(self, size, focus=False):
+    CountedRow.renders += 1
+    return self.__super.render(size, focus)
+
+
+def bench_focusmove():
+  """ Focus moves down a list box of 1000 rows, its canvases not kept by the screen: rows rendered per move. """
+  n = 1000
+  size = (80, 24)
+  moves = size[1] - 1  # within the view
+  results = []
+  for listbox_class in (urwidm.ListBox, urwidm.ListBoxMore):
+    listbox = listbox_class(urwidm.SimpleListWalker([CountedRow("row {0}".format(i)) for i in range(n)]))
+    listbox.render(size, True)
+    CountedRow.renders = 0
+    start = time.time()
+    for i in range(moves):
+      listbox.keypress(size, 'down')
+      listbox.render(size, True)
+    results.append(((time.time() - start) / moves, CountedRow.renders / moves))
+    CountedRow.renders = 0
+    listbox.keypress(size, 'down')  # scrolls by one row
+    listbox.render(size, True)
+    results.append(CountedRow.renders)
+  assert results[2][1] == 2 and results[3] <= 3
+  print("focusmove: {0} moves in a view of {1} rows, {2:.3f}ms and {3:.0f} rows rendered per move by urwid, {4:.3f}ms and {5:.0f} by ListBoxMore; "
+        "a scroll renders {6} and {7} rows".format(moves, size[1], 1000 * results[0][0], results[0][1], 1000 * results[2][0], results[2][1], results[1], results[3]))
+
+
+def bench_frame():
+  """ Render of a FrameMore with a trimmed header, when only its body changes. """
+  n = 2000
+  header = urwidm.PileMore([urwidm.TextMore("header line {0}".format(i)) for i in range(5)])
+  footer = urwidm.PileMore([urwidm.TextMore("footer line {0}".format(i)) for i in range(5)])
+  body = urwidm.FillerMore(urwidm.EditMore("body: "))
+  frame = urwidm.FrameMore(body, header, footer)
+  size = (80, 8)
+  canvas = frame.render(size, True)
+  assert frame.render(size, True) is canvas  # unchanged parts, cached canvas
+  start = time.time()
+  for i in range(n):
+    body._invalidate()
+    canvas = frame.render(size, True)  # like a screen, keep the last canvas alive
+  print("frame: {0:.1f}us per render".format(1e6 * (time.time() - start) / n))
+
+
+def card(i):
+  """ An expensive list row: a boxed card of nested columns and piles. """
+  fields = [urwidm.ColumnsMore([("fixed", 10, urwidm.TextMore("field {0}".format(j))), urwidm.TextMore("value {0}.{1}".format(i, j))]) for j in range(3)]
+  return urwidm.LineBoxMore(urwidm.ColumnsMore([urwidm.PileMore(fields), ("fixed", 12, urwidm.PileMore([urwidm.ButtonMore("Open"), urwidm.CheckBoxMore("Done")]))]), "card {0}".format(i))
+
+
+def bench_prefetch():
+  """ Page down through a list box of 2000 cards, rendering the next pages when idle or not. """
+  n = 2000
+  pages = 60
+  size = (80, 40)
+  timings = []
+  slices = []
+  screen = [None]  # like a screen, keep the last canvas alive
+  gc.disable()  # the collections of the cards would be counted in the pages or the slices they fall in
+  try:
+    for prefetch in (False, True):
+      listbox = urwidm.ListBoxMore(urwidm.SimpleListWalker([card(i) for i in range(n)]))
+      if prefetch:
+        listbox.prefetch_rows = 2 * size[1]
+      screen[0] = listbox.render(size, True)
+      elapsed = 0
+      for i in range(pages):
+        while UIDispatcher.idle_pending():
+          start = time.time()
+          UIDispatcher.run_idle()
+          slices.append(time.time() - start)
+        listbox.keypress(size, 'page down')
+        start = time.time()
+        screen[0] = listbox.render(size, True)
+        elapsed += time.time() - start
+      timings.append(elapsed / pages)
+  finally:
+    gc.enable()
+  assert listbox.get_focus()[1] > pages * 5
+  # a change of the list box stops the prefetch running
+  listbox.render(size, True)
+  assert UIDispatcher.idle_pending()
+  listbox.keypress(size, 'page down')
+  assert not UIDispatcher.run_idle()
+  print("prefetch: page down through {0} cards in {1:.1f}ms, {2:.1f}ms with the next pages rendered when idle, in slices of {3:.1f}ms at most".format(
+    n, 1000 * timings[0], 1000 * timings[1], 1000 * max(slices)))
+
+
+class MouseProbe(object):
+  """ Mixin recording the mouse events a widget gets. """
+  events = []
+
+  def mouse_event(self, size, event, button, col, row, focus):
+    self.events.append((self, size, col, row, focus))
+    return True
+
+
+class ProbeEdit(MouseProbe, urwidm.EditMore):
+  pass
+
+
+class ProbeButton(MouseProbe, urwidm.ButtonMore):
+  pass
+
+
+def bench_mouse():
+  """ Mouse drags routed through the containers and through a MouseRouter, over a form with lists and an overlay. """
+  def form_row(i):
+    return urwidm.ColumnsMore([('fixed', 12, urwidm.TextMore("field {0}".format(i))), ProbeEdit("", "value {0}".format(i)), ('fixed', 10, ProbeButton("OK"))], 1)
+  header = urwidm.PileMore([urwidm.PaddingMore(form_row(i), width=('relative', 100), left=2, right=2) for i in range(8)])
+  lists = [urwidm.ListBoxMore(urwidm.SimpleListWalker([form_row(i) for i in range(200)])) for j in range(3)]
+  frame = urwidm.FrameMore(urwidm.ColumnsMore(lists, 1), header)
+  dialog_widgets = [ProbeEdit("overlay: "), ProbeButton("Close")]
+  dialog = urwidm.LineBoxMore(urwidm.FillerMore(urwidm.PileMore(dialog_widgets)))
+  size = (150, 40)
+  points = [(col, row) for row in range(size[1]) for col in range(size[0])]
+  for top in (frame, urwidm.OverlayMore(dialog, frame, 'center', 40, 'middle', 4)):
+    router = urwidm.MouseRouter(top)
+    canvas = router.render(size, True)
+    routed = set()
+    for col, row in points:
+      del MouseProbe.events[:]
+      top.mouse_event(size, 'mouse drag', 1, col, row, True)
+      expected = list(MouseProbe.events)
+      del MouseProbe.events[:]
+      router.mouse_event(size, 'mouse drag', 1, col, row, True)
+      assert MouseProbe.events == expected, (col, row, expected, MouseProbe.events)
+      routed.update(event[0] for event in MouseProbe.events)
+    del MouseProbe.events[:]
+    # the overlay only passes the events to its top widget
+    assert routed == set(dialog_widgets) if top is not frame else len(routed) > 100, routed
+  router = urwidm.MouseRouter(frame)
+  canvas = router.render(size, True)
+  timings = []
+  for route in (frame, router):
+    start = time.time()
+    for col, row in points:
+      route.mouse_event(size, 'mouse drag', 1, col, row, True)
+    timings.append(1e6 * (time.time() - start) / len(points))
+    del MouseProbe.events[:]
+  # a change since the last render: back to the containers until the next one
+  assert router.get_index(size, True) is not None
+  lists[1].set_focus(5)
+  assert router.get_index(size, True) is None
+  canvas = router.render(size, True)  # noqa
+  assert router.get_index(size, True) is not None
+  start = time.time()
+  urwidm.MouseIndex(canvas)
+  built = time.time() - start
+  print("mouse: {0} drags over a form of {1} rows, {2:.1f}us per drag through the containers, {3:.1f}us with the MouseRouter, index built in {4:.2f}ms".format(
+    len(points), size[1], timings[0], timings[1], 1000 * built))
+
+
+def bench_hotkeys():
+  """ A global key handled by a 40-level deep tree returning it unhandled, and by the HotkeyRegistry. """
+  Registry = urwidm.HotkeyRegistry
+  depth = 40
+  n = 10000
+  edit = urwidm.EditMore("deep: ")
+  w = edit
+  for i in range(depth // 2):
+    w = urwidm.PileMore([urwidm.TextMore("label"), urwidm.ColumnsMore([("fixed", 1, urwidm.TextMore("|")), w])], focus_item=1)
+  top = urwidm.FrameMore(urwidm.ListBoxMore(urwidm.SimpleListWalker([w])))
+  size = (80, 24)
+  calls = []
+  quit_keys = {'f10': calls.append}
+  start = time.time()
+  for i in range(n):
+    key = top.keypress(size, 'f10')
+    if key in quit_keys:
+      quit_keys[key](key)
+  through_tree = (time.time() - start) / n
+  assert len(calls) == n and edit.edit_text == ""
+  bar = urwidm.OptCols([(('f10',), "Quit"), (('f1',), "Help")], calls.append)
+  bar.register_hotkeys()
+  try:
+    del calls[:]
+    start = time.time()
+    for i in range(n):
+      Registry.dispatch('f10')
+    registry = (time.time() - start) / n
+    assert len(calls) == n
+    # before the tree, in a MainLoop
+    del calls[:]
+    ui = fake_display.Screen(size)
+    ui.script_input('f1', 'x', 'f10')
+    urwidm.MainLoop(top, screen=ui, input_filter=Registry.input_filter).run()
+    assert calls == ["f1", "f10"] and edit.edit_text == "x", (calls, edit.edit_text)
+    # priorities, then the nearest scope
+    Registry.register('f1', lambda key: calls.append('urgent help'), priority=1)
+    dialog = urwidm.Dialog2("Sure?", 10, 40)
+    dialog.add_buttons([("Yes", 1, 'y'), ("No", 0, 'n')])
+    dialog.add_hotkey('f1', lambda key: calls.append('dialog help'))
+    del calls[:]
+    Registry.push(dialog, modal=False)
+    Registry.dispatch('f1')
+    Registry.pop(dialog)
+    Registry.dispatch('f1')
+    assert calls == ['urgent help'] * 2
+    # a running dialog is modal: the keys of the main screen are hidden
+    del calls[:]
+    ui.script_input('f10', 'f1', 'n')
+    assert dialog.run(ui, top) == (0, "")
+    assert calls == ['dialog help']
+  finally:
+    bar.unregister_hotkeys()
+    Registry.clear()
+  assert Registry.lookup('f10') is None
+  print("hotkeys: global key through a {0}-level tree in {1:.1f}us, through the HotkeyRegistry in {2:.1f}us".format(
+    depth, 1e6 * through_tree, 1e6 * registry))
+
+
+def bench_widths():
+  """ Display widths of a 100k-item list mixing ASCII, wide and combining characters, measured and cached. """
+  n = 100000
+  words = ["file", "ファイル", "re\u0301sume\u0301", "文档", "log", "données"]
+  items = ["{0} {1} {2}".format(words[i % 6], i, words[i // 6 % 6]) for i in range(n)]
+  assert urwidm.text_width("文档 re\u0301sume\u0301") == 11 and urwidm.text_width("ab\nファイル") == 8
+  start = time.time()
+  widths = [urwidm.text_width(item) for item in items]
+  measured = time.time() - start
+  from urwid import old_str_util
+  old_str_util.set_byte_encoding('utf8')
+  start = time.time()
+  assert [old_str_util.calc_width(item, 0, len(item)) for item in items] == widths
+  python_measured = time.time() - start
+  # the cache, whatever calc_width urwid uses: a cold pass, then a warm one, with the default size and with n
+  Cache = urwidm.TextWidthCache
+  saved = Cache.enabled, Cache.size
+  timings = []
+  try:
+    Cache.enabled = True
+    for size in (Cache.size, n):
+      Cache.size = size
+      Cache.clear()
+      for i in range(2):
+        start = time.time()
+        assert [urwidm.text_width(item) for item in items] == widths
+        timings.append(time.time() - start)
+  finally:
+    Cache.enabled, Cache.size = saved
+    Cache.clear()
+  # the sizing code uses display widths: the arrow of a combo with a wide label is where it is drawn
+  combo = urwidm.ComboBox("選択", ["一", "二"])
+  row = combo.render((20,)).text[0].decode('utf8')
+  arrow = urwidm.calc_width(row, 0, row.index(combo.DOWN_ARROW))
+  opened = []
+  urwidm.connect_signal(combo, 'displaycombo', opened.append)
+  combo.mouse_event((20,), 'mouse press', 1, arrow - 1, 0, True)
+  combo.mouse_event((20,), 'mouse press', 1, arrow, 0, True)
+  assert len(opened) == 1
+  print("widths: {0} items measured in {1:.0f}ms by urwid ({2}), {3:.0f}ms by old_str_util; cached: {4:.0f}ms then {5:.0f}ms in {6} entries, {7:.0f}ms then {8:.0f}ms in {0}".format(
+    n, 1000 * measured, "python" if saved[0] else "C extension", 1000 * python_measured,
+    1000 * timings[0], 1000 * timings[1], saved[1], 1000 * timings[2], 1000 * timings[3]))
+
+
+def bench_import():
+  """ Time of import urwidm in a new interpreter, alone and followed by the first access to a widget class. """
+  n = 20
+  for name, code in (
+    ('import urwidm', 'import urwidm'),
+    ('import urwidm + CheckBoxMore("x")', 'import urwidm; urwidm.CheckBoxMore("x")'),
+  ):
+    start = time.time()
+    for i in range(n):
+      subprocess.check_call([sys.executable, '-c', code])
+    empty = time.time()
+    for i in range(n):
+      subprocess.check_call([sys.executable, '-c', 'pass'])
+    end = time.time()
+    print("import: {0}: {1:.1f}ms".format(name, 1000 * ((empty - start) - (end - empty)) / n))
+  # the submodules of urwidm, not the urwid modules of the same name, before any of them is imported
+  subprocess.check_call([sys.executable, '-c', 'import urwidm; from urwidm import container, listbox; '
+                         'assert urwidm.widget.__name__ == "urwidm.widget" and container.__name__ == "urwidm.container" '
+                         'and listbox.__name__ == "urwidm.listbox"'])
+
+
+benchmarks = {
+  'attrs': bench_attrs,
+  'bulk': bench_bulk,
+  'combo': bench_combo,
+  'damage': bench_damage,
+  'dialog': bench_dialog,
+  'edit': bench_edit,
+  'focus': bench_focus,
+  'focusmove': bench_focusmove,
+  'frame': bench_frame,
+  'hotkeys': bench_hotkeys,
+  'import': bench_import,
+  'jump': bench_jump,
+  'memory': bench_memory,
+  'mouse': bench_mouse,
+  'prefetch': bench_prefetch,
+  'repeat': bench_repeat,
+  'replay': bench_replay,
+  'ring': bench_ring,
+  'sensitivity': bench_sensitivity,
+  'tail': bench_tail,
+  'theme': bench_theme,
+  'updates': bench_updates,
+  'viewer': bench_viewer,
+  'widths': bench_widths,
+}
+if __name__ == '__main__':
+  for name in sys.argv[1:] or sorted(benchmarks):
+    benchmarks[name]()
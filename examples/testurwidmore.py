@@ -4,6 +4,7 @@
 from __future__ import division, unicode_literals, print_function, absolute_import
 
 import urwidm
+from urwidm.futures import UIDispatcher, in_thread
 import time
 palette = [
     ('body', 'light gray', 'black'),
@@ -54,8 +55,9 @@ def focusLost(widget, context):
 
 
 def connectFocus(widget, context):
-  urwidm.connect_signal(widget, 'focusgain', focusGain, context)
-  urwidm.connect_signal(widget, 'focuslost', focusLost, context)
+  # the slow handlers run in threads, the input is not blocked while they answer
+  urwidm.connect_signal(widget, 'focusgain', in_thread(focusGain), context)
+  urwidm.connect_signal(widget, 'focuslost', in_thread(focusLost), context)
 
 
 def btn4_clicked(btn):
@@ -116,4 +118,5 @@ frame = urwidm.FrameMore(body, header, footer, focus_part='body')
 frame.attr = 'body'
 mainView = frame
 loop = urwidm.MainLoop(mainView, palette, handle_mouse=True, unhandled_input=handleKeys, pop_ups=True)
+UIDispatcher.attach(loop)
 loop.run()
@@ -0,0 +1,736 @@
+#!/usr/bin/env python
+# coding: utf-8
+# vim:et:sta:sts=2:sw=2:ts=2:tw=0:
+"""
+More versions of the urwid container widgets.
+"""
+from __future__ import unicode_literals
+
+from urwid import WidgetContainer, Frame, Pile, Columns, GridFlow, Overlay, Divider, CanvasCombine
+from urwid.util import is_mouse_press as urwid_is_mouse_press
+from urwidm.keyrepeat import handles_repeat, keypress_repeated, repeat_count, repeated
+from urwidm.widget import FocusEventWidget, FocusTransition, More, drop_mouse_targets
+from urwidm.decoration import FillerMore, PaddingMore
+
+
+class BulkUpdate(object):
+  """
+  Changes of the widgets of a PileMore or a ColumnsMore, applied at once at the end of the with block
+  (see their bulk_update): the container is invalidated once, and its focus set once.
+  The widget_list, and the item_types or column_types, may also be changed directly in the block.
+  The focus stays on the widget in focus if it is still there, unless set_focus asked for another one,
+  else it goes to the first selectable widget from its position. Only this final change emits focus events,
+  when the container has the focus: a widget still there may refuse it, a widget removed looses the focus
+  whatever its answer, and a widget refusing to gain it is passed over for the next one accepting it.
+  If the block raises, the container is left as it was, without focus event.
+  """
+  def __init__(self, container, types):
+    self.container = container
+    self.types = types
+    self._focus = None
+
+  def __enter__(self):
+    self._old_position = self.container._focus_position()
+    self._old_focus = None if self._old_position is None else self.container.widget_list[self._old_position]
+    self._old_widgets = list(self.container.widget_list)
+    self._old_types = list(self.types)
+    self.container.widget_list.set_modified_callback(lambda: None)
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    if exc_type is not None:
+      self.container.widget_list[:] = self._old_widgets
+      self.types[:] = self._old_types
+      self.container._set_focus_position(self._old_position)
+    self.container.widget_list.set_modified_callback(self.container._invalidate)
+    if exc_type is None:
+      self._commit()
+
+  def _position(self, item):
+    if type(item) == int:
+      return item
+    for i, widget in enumerate(self.container.widget_list):
+      if widget is item:
+        return i
+    raise ValueError("{0!r} is not in the widget list".format(item))
+
+  def insert(self, index, widget, options=('weight', 1)):
+    """ options: like the tuples of the widget list of the container, without the widget. """
+    self.container.widget_list.insert(index, widget)
+    self.types.insert(index, options)
+
+  def append(self, widget, options=('weight', 1)):
+    self.insert(len(self.container.widget_list), widget, options)
+
+  def remove(self, item):
+    """ item -- widget or integer index """
+    position = self._position(item)
+    del self.container.widget_list[position]
+    del self.types[position]
+
+  def replace(self, item, widget, options=None):
+    """ item -- widget or integer index, options -- None to keep them """
+    position = self._position(item)
+    self.container.widget_list[position] = widget
+    if options is not None:
+      self.types[position] = options
+
+  def clear(self):
+    del self.container.widget_list[:]
+    del self.types[:]
+
+  def set_focus(self, item):
+    """ item -- widget or integer index in the widget list once updated """
+    self._focus = item
+
+  def _commit(self):
+    container = self.container
+    widgets = container.widget_list
+    # the widgets added or removed directly in widget_list
+    del self.types[len(widgets):]
+    self.types.extend([('weight', 1)] * (len(widgets) - len(self.types)))
+    positions = dict((id(widget), i) for i, widget in enumerate(widgets))
+    old = self._old_focus
+    kept = old is not None and id(old) in positions
+    # the selectable widgets from the old position, then before it
+    start = max(0, min(self._old_position or 0, len(widgets) - 1))
+    candidates = [i for i in range(start, len(widgets)) + range(start - 1, -1, -1) if widgets[i].selectable()]
+    if self._focus is not None:
+      position = self._focus if type(self._focus) == int else positions[id(self._focus)]
+    elif kept:
+      position = positions[id(old)]
+    elif widgets:
+      position = candidates[0] if candidates else start
+    else:
+      position = None
+    if kept:
+      container._set_focus_position(positions[id(old)])
+      if widgets[position] is not old:
+        container.set_focus(position)
+    else:
+      container._set_focus_position(position)
+      if container.has_focus:
+        if isinstance(old, FocusEventWidget):
+          old.loose_focus()
+        if position is not None and not self._gain_focus(widgets[position]):
+          # the next selectable widget accepting the focus gets it, else any widget accepting it
+          selectable = set(candidates)
+          others = [i for i in range(len(widgets)) if i not in selectable]
+          position = next((i for i in candidates + others if i != position and self._gain_focus(widgets[i])), None)
+          container._set_focus_position(position)
+      if isinstance(old, FocusEventWidget):
+        # a widget removed looses the focus whatever its answer
+        old._set_has_focus(False)
+    container._invalidate()
+
+  def _gain_focus(self, widget):
+    return widget.gain_focus() if isinstance(widget, FocusEventWidget) else True
+
+
+class WidgetContainerMore(More, WidgetContainer):
+  _default_sensitive_attr = 'body'
+  _default_unsensitive_attr = 'body'
+
+  def __init__(self, widget_list):
+    More.__init__(self)
+    WidgetContainer.__init__(self, widget_list)
+
+  def get_subwidgets(self):
+    return list(self.widget_list)
+
+
+class FrameMore(More, Frame):
+  _default_sensitive_attr = 'body'
+  _default_unsensitive_attr = 'body'
+  _selectable = True
+  _filler_widget_class = FillerMore
+  _fillers = None  # part -> filler wrapping the trimmed header or footer, kept across renders
+
+  def __init__(self, body, header=None, footer=None, focus_part='body'):
+    More.__init__(self)
+    Frame.__init__(self, body, header, footer, focus_part)
+    self.set_focus('body')
+
+  @property
+  def _handles_repeat(self):
+    return handles_repeat({'header': self.header, 'body': self.body, 'footer': self.footer}[self.focus_part])
+
+  def render(self, size, focus=False):
+    """Render frame and return it."""
+    (maxcol, maxrow) = size
+    (htrim, ftrim), (hrows, frows) = self.frame_top_bottom((maxcol, maxrow), focus)
+    combinelist = []
+    depends_on = []
+    head = None
+    if htrim and htrim < hrows:
+      head = self._get_filler('header', 'top').render((maxcol, htrim), focus and self.focus_part == 'header')
+    elif htrim:
+      head = self.header.render((maxcol,), focus and self.focus_part == 'header')
+      assert head.rows() == hrows, "rows, render mismatch"
+    if head:
+      combinelist.append((head, 'header', self.focus_part == 'header'))
+      depends_on.append(self.header)
+    if ftrim + htrim < maxrow:
+      body = self.body.render((maxcol, maxrow - ftrim - htrim), focus and self.focus_part == 'body')
+      combinelist.append((body, 'body', self.focus_part == 'body'))
+      depends_on.append(self.body)
+      pass
+    foot = None
+    if ftrim and ftrim < frows:
+      foot = self._get_filler('footer', 'bottom').render((maxcol, ftrim), focus and self.focus_part == 'footer')
+    elif ftrim:
+      foot = self.footer.render((maxcol,), focus and self.focus_part == 'footer')
+      assert foot.rows() == frows, "rows, render mismatch"
+    if foot:
+      combinelist.append((foot, 'footer', self.focus_part == 'footer'))
+      depends_on.append(self.footer)
+    return self.canvas_with_attr(CanvasCombine(combinelist), focus)
+    # return CanvasCombine(combinelist)
+
+  def _get_filler(self, part, valign):
+    """
+    Return the filler wrapping the header or the footer when it is trimmed.
+    It is only created again when the part changes, so its canvas stays cached between renders.
+    """
+    w = self._get_focus_widget(part)
+    if self._fillers is None:
+      self._fillers = {}
+    filler = self._fillers.get(part)
+    if filler is None or filler.original_widget is not w:
+      filler = self._fillers[part] = self._filler_widget_class(w, valign)
+    return filler
+
+  def _get_focus_widget(self, part):
+    assert part in ('header', 'footer', 'body')
+    if part == 'header':
+      focus_w = self.get_header()
+    elif part == 'footer':
+      focus_w = self.get_footer()
+    else:  # part == 'body'
+      focus_w = self.get_body()
+    return focus_w
+
+  def set_focus(self, part):
+    """
+    Set the part of the frame that is in focus.
+    part -- 'header', 'footer' or 'body'
+    """
+    assert part in ('header', 'footer', 'body')
+    ok = True
+    old_part = self.focus_part
+    with FocusTransition(self, lambda: Frame.set_focus(self, old_part)) as transition:
+      if self.has_focus:
+        focus_w = self._get_focus_widget(self.get_focus())
+        if focus_w and isinstance(focus_w, FocusEventWidget):
+          ok = focus_w.loose_focus()
+        if ok:
+          focus_w = self._get_focus_widget(part)
+          if isinstance(focus_w, FocusEventWidget):
+            ok = focus_w.gain_focus()
+    if ok:
+      Frame.set_focus(self, part)
+      transition.commit()
+    else:
+      transition.cancel()
+
+  def get_focused_subwidget(self):
+    return self._get_focus_widget(self.get_focus())
+
+  def set_focused_subwidget(self, widget, events=True):
+    part = [part for part in ('header', 'body', 'footer') if self._get_focus_widget(part) is widget][0]
+    if events:
+      self.set_focus(part)
+    else:
+      Frame.set_focus(self, part)
+    return self.get_focused_subwidget() is widget
+
+  def get_subwidgets(self):
+    return [w for w in (self.header, self.body, self.footer) if w is not None]
+
+
+class PileMore(More, Pile):
+  _default_sensitive_attr = 'body'
+  _default_unsensitive_attr = 'body'
+  _handles_repeat = True
+  coalesce_focus_events = True
+  """ the moves of a repeated key (see urwidm.keyrepeat) only send focus events to the widget left and the widget reached """
+
+  def __init__(self, widget_list, focus_item=None):
+    More.__init__(self)
+    Pile.__init__(self, widget_list, focus_item)
+
+  def selectable(self):
+    return Pile.selectable(self) and self.sensitive
+
+  def keypress(self, size, key):
+    """
+    Pass the keypress to the widget in focus.
+    Unhandled 'up' and 'down' keys may cause a focus change.
+    Copied from original Pile but with custom focus event handling.
+    """
+    if repeat_count(key) > 1:
+      return self._keypress_repeated(size, key)
+    item_rows = None
+    if len(size) == 2:
+      item_rows = self.get_item_rows(size, focus=True)
+    i = self.widget_list.index(self.focus_item)
+    f, height = self._get_item_types(i)
+    if self.focus_item.selectable():
+      tsize = self.get_item_size(size, i, True, item_rows)
+      key = self.focus_item.keypress(tsize, key)
+      if self._command_map[key] not in ('cursor up', 'cursor down'):
+        return key
+    if self._command_map[key] == 'cursor up':
+      candidates = range(i - 1, -1, -1)  # count backwards to 0
+    else:  # self._command_map[key] == 'cursor down'
+      candidates = range(i + 1, len(self.widget_list))
+    if not item_rows:
+      item_rows = self.get_item_rows(size, focus=True)
+    for j in candidates:
+      if not self.widget_list[j].selectable():
+        continue
+      self._update_pref_col_from_focus(size)
+      old_focus = self.focus_item
+      self.set_focus(j)
+      if old_focus == self.focus_item:  # focus change has been denied
+        return
+      if not hasattr(self.focus_item, 'move_cursor_to_coords'):
+        return
+      f, height = self._get_item_types(i)
+      rows = item_rows[j]
+      if self._command_map[key] == 'cursor up':
+        rowlist = range(rows - 1, -1, -1)
+      else:  # self._command_map[key] == 'cursor down'
+        rowlist = range(rows)
+      for row in rowlist:
+        tsize = self.get_item_size(size, j, True, item_rows)
+        if self.focus_item.move_cursor_to_coords(tsize, self.pref_col, row):
+          break
+      return
+    # nothing to select
+    return key
+
+  def _keypress_repeated(self, size, key):
+    """
+    Handle the presses of a RepeatedKey: the widget in focus takes the ones it handles, each 'up' or 'down'
+    left moves the focus to the next selectable widget. The rows of the items are only computed again
+    when the widget in focus handled presses.
+    """
+    count = key.presses
+    key = unicode(key)
+    start = self.focus_item
+    item_rows = None
+    key_left = None
+    while count:
+      i = self.widget_list.index(self.focus_item)
+      if item_rows is None:
+        item_rows = self.get_item_rows(size, focus=True)
+      if self.focus_item.selectable():
+        tsize = self.get_item_size(size, i, True, item_rows)
+        key_left = keypress_repeated(self.focus_item, tsize, key, count)
+        if key_left is None:
+          break
+        if repeat_count(key_left) < count:
+          item_rows = None
+        count, key = repeat_count(key_left), unicode(key_left)
+        if self._command_map[key] not in ('cursor up', 'cursor down'):
+          break
+        key_left = None
+      if self._command_map[key] == 'cursor up':
+        candidates = range(i - 1, -1, -1)
+      else:
+        candidates = range(i + 1, len(self.widget_list))
+      for j in candidates:
+        if self.widget_list[j].selectable():
+          break
+      else:  # nothing to select
+        key_left = repeated(key, count)
+        break
+      self._update_pref_col_from_focus(size)
+      if self.coalesce_focus_events:
+        Pile.set_focus(self, j)
+      else:
+        old_focus = self.focus_item
+        self.set_focus(j)
+        if old_focus == self.focus_item:  # focus change has been denied
+          break
+      count -= 1
+      if hasattr(self.focus_item, 'move_cursor_to_coords'):
+        if item_rows is None:
+          item_rows = self.get_item_rows(size, focus=True)
+        rows = item_rows[j]
+        rowlist = range(rows - 1, -1, -1) if self._command_map[key] == 'cursor up' else range(rows)
+        for row in rowlist:
+          tsize = self.get_item_size(size, j, True, item_rows)
+          if self.focus_item.move_cursor_to_coords(tsize, self.pref_col, row):
+            break
+    end = self.focus_item
+    if self.coalesce_focus_events and end is not start:
+      # back to the widget left, to move from it to the widget reached with the focus events
+      Pile.set_focus(self, start)
+      self.set_focus(end)
+    return key_left
+
+  def set_focus(self, item):
+    """
+    Set the item in focus.
+    item -- widget or integer index
+    """
+    ok = True
+    if not hasattr(self, "focus_item"):
+      Pile.set_focus(self, item)
+    old_item = self.focus_item
+    with FocusTransition(self, lambda: Pile.set_focus(self, old_item)) as transition:
+      if self.focus_item:
+        focus_w = self.get_focus()
+        if type(item) == int:
+          new_focus_w = self.widget_list[item]
+        else:
+          new_focus_w = item
+        if focus_w != new_focus_w:
+          if focus_w and isinstance(focus_w, FocusEventWidget):
+            ok = focus_w.loose_focus()
+          if ok:
+            if isinstance(new_focus_w, FocusEventWidget):
+              ok = new_focus_w.gain_focus()
+    if ok:
+      Pile.set_focus(self, item)
+      transition.commit()
+    else:
+      transition.cancel()
+
+  def bulk_update(self):
+    """
+    Return a BulkUpdate to change many widgets at once:
+      with pile.bulk_update() as update:
+        update.remove(0)
+        update.append(widget, ('fixed', 3))
+    """
+    return BulkUpdate(self, self.item_types)
+
+  def _focus_position(self):
+    for i, widget in enumerate(self.widget_list):
+      if widget is self.focus_item:
+        return i
+    return None
+
+  def _set_focus_position(self, position):
+    self.focus_item = None if position is None else self.widget_list[position]
+
+  def get_focused_subwidget(self):
+    return self.get_focus()
+
+  def set_focused_subwidget(self, widget, events=True):
+    if events:
+      self.set_focus(widget)
+    else:
+      Pile.set_focus(self, widget)
+    return self.focus_item is widget
+
+  def get_subwidgets(self):
+    return list(self.widget_list)
+
+  def get_focus_pos(self):
+    """
+    Return the 1-based position of the select item in focus or 0 if none.
+    """
+    fw = self.get_focus()
+    pos = 0
+    if fw:
+      pos = self.widget_list.index(fw)
+    return pos
+
+  def render(self, size, focus=False):
+    return self.canvas_with_attr(self.__super.render(size, focus), focus)
+
+
+class ColumnsMore(More, Columns):
+  _default_sensitive_attr = 'body'
+  _default_unsensitive_attr = 'body'
+
+  def __init__(self, widget_list, dividechars=0, focus_column=None, min_width=1, box_columns=None):
+    More.__init__(self)
+    Columns.__init__(self, widget_list, dividechars, focus_column, min_width, box_columns)
+
+  def selectable(self):
+    return Columns.selectable(self) and self.sensitive
+
+  @property
+  def _handles_repeat(self):
+    # up and down go through the column in focus
+    return handles_repeat(self.get_focus())
+
+  def keypress(self, size, key):
+    ret = None
+    if self.focus_col is None:
+      ret = key
+    else:
+      widths = self.column_widths(size)
+      if self.focus_col < 0 or self.focus_col >= len(widths):
+        ret = key
+      else:
+        i = self.focus_col
+        mc = widths[i]
+        w = self.widget_list[i]
+        if self._command_map[key] not in ('cursor up', 'cursor down', 'cursor page up', 'cursor page down'):
+          self.pref_col = None
+        key = w.keypress((mc,) + size[1:], key)
+        if self._command_map[key] not in ('cursor left', 'cursor right'):
+          ret = key
+        else:
+          if self._command_map[key] == 'cursor left':
+            candidates = range(i - 1, -1, -1)  # count backwards to 0
+          else:  # key == 'right'
+            candidates = range(i + 1, len(widths))
+          for j in candidates:
+            if not self.widget_list[j].selectable():
+              continue
+            self.set_focus_column(j)
+            # ret = None
+            ret = key
+            break
+          else:
+            ret = key
+    return ret
+
+  def set_focus_column(self, num):
+    """Set the column in focus by its index in self.widget_list."""
+    ok = True
+    old_col = self.focus_col
+    with FocusTransition(self, lambda: Columns.set_focus_column(self, old_col)) as transition:
+      if self.get_focus_column():
+        focus_w = self.get_focus()
+        if isinstance(focus_w, FocusEventWidget):
+          ok = focus_w.loose_focus()
+      if ok:
+        focus_w = self.widget_list[num]
+        if isinstance(focus_w, FocusEventWidget):
+          ok = focus_w.gain_focus()
+    if ok:
+      Columns.set_focus_column(self, num)
+      transition.commit()
+    else:
+      transition.cancel()
+
+  def set_focus(self, item):
+    """Set the item in focus. item -- widget or integer index"""
+    if type(item) == int:
+      assert item >= 0 and item < len(self.widget_list)
+      position = item
+    else:
+      position = self.widget_list.index(item)
+    ok = True
+    old_col = self.focus_col
+    with FocusTransition(self, lambda: Columns.set_focus_column(self, old_col)) as transition:
+      if self.has_focus:
+        if self.get_focus_column():
+          focus_w = self.get_focus()
+          if isinstance(focus_w, FocusEventWidget):
+            ok = focus_w.loose_focus()
+        if ok:
+          focus_w = self.widget_list[position]
+          if isinstance(focus_w, FocusEventWidget):
+            ok = focus_w.gain_focus()
+    if ok:
+      self.focus_col = position
+      self._invalidate()
+      transition.commit()
+    else:
+      transition.cancel()
+    return ok
+
+  def bulk_update(self):
+    """ Return a BulkUpdate to change many columns at once, see PileMore.bulk_update. """
+    return BulkUpdate(self, self.column_types)
+
+  def _focus_position(self):
+    if self.focus_col is None or self.focus_col >= len(self.widget_list):
+      return None
+    return self.focus_col
+
+  def _set_focus_position(self, position):
+    self.focus_col = position or 0
+    self.has_flow_type = any(column_type[0] == 'flow' for column_type in self.column_types)
+
+  def get_focused_subwidget(self):
+    return self.get_focus()
+
+  def set_focused_subwidget(self, widget, events=True):
+    if events:
+      return self.set_focus(widget)
+    Columns.set_focus(self, widget)
+    return True
+
+  def get_subwidgets(self):
+    return list(self.widget_list)
+
+  def mouse_event(self, size, event, button, col, row, focus):
+    """
+    Send event to appropriate column.
+    May change focus on button 1 press.
+    """
+    widths = self.column_widths(size)
+    x = 0
+    for i in range(len(widths)):
+      if col < x:
+        return False
+      w = self.widget_list[i]
+      end = x + widths[i]
+      if col >= end:
+        x = end + self.dividechars
+        continue
+      focus = focus and self.focus_col == i
+      ok = True
+      if urwid_is_mouse_press(event) and button == 1:
+        if w.selectable():
+          ok = self.set_focus(w)
+      if not ok or not hasattr(w, 'mouse_event'):
+        return False
+      return w.mouse_event((end - x,) + size[1:], event, button, col - x, row, focus)
+    return False
+
+  def render(self, size, focus=False):
+    return self.canvas_with_attr(self.__super.render(size, focus), focus)
+
+
+class GridFlowMore(More, GridFlow):
+  _default_sensitive_attr = 'body'
+  _default_unsensitive_attr = 'body'
+  _column_widget_class = ColumnsMore
+  _padding_widget_class = PaddingMore
+  _pile_widget_class = PileMore
+
+  def __init__(self, cells, cell_width, h_sep, v_sep, align):
+    More.__init__(self)
+    GridFlow.__init__(self, cells, cell_width, h_sep, v_sep, align)
+    for cell in cells:
+      if cell.selectable():
+        self.focus_cell = cell
+        break
+
+  def selectable(self):
+    return GridFlow.selectable(self) and self.sensitive
+
+  def generate_display_widget(self, size):
+    """
+    Actually generate display widget (ignoring cache)
+    Copied from original GridFlow but with custom sub-widgets.
+    """
+    (maxcol,) = size
+    d = Divider()  # don't customize Divider, it's really a basic class.
+    if len(self.cells) == 0:  # how dull
+      return d
+    if self.v_sep > 1:
+      # increase size of divider
+      d.top = self.v_sep - 1
+    # cells per row
+    bpr = (maxcol + self.h_sep) // (self.cell_width + self.h_sep)
+    if bpr == 0:  # too narrow, pile them on top of eachother
+      l = [self.cells[0]]
+      f = 0
+      for b in self.cells[1:]:
+        if b is self.focus_cell:
+          f = len(l)
+        if self.v_sep:
+          l.append(d)
+        l.append(b)
+      return self._pile_widget_class(l, f)
+    if bpr >= len(self.cells):  # all fit on one row
+      k = len(self.cells)
+      f = self.cells.index(self.focus_cell)
+      cols = self._column_widget_class(self.cells, self.h_sep, f)
+      rwidth = (self.cell_width + self.h_sep) * k - self.h_sep
+      row = self._padding_widget_class(cols, self.align, rwidth)
+      return row
+    out = []
+    s = 0
+    f = 0
+    while s < len(self.cells):
+      if out and self.v_sep:
+        out.append(d)
+      k = min(len(self.cells), s + bpr)
+      cells = self.cells[s:k]
+      if self.focus_cell in cells:
+        f = len(out)
+        fcol = cells.index(self.focus_cell)
+        cols = self._column_widget_class(cells, self.h_sep, fcol)
+      else:
+        cols = self._column_widget_class(cells, self.h_sep)
+      rwidth = (self.cell_width + self.h_sep) * (k - s) - self.h_sep
+      row = self._padding_widget_class(cols, self.align, rwidth)
+      out.append(row)
+      s += bpr
+    return self._pile_widget_class(out, f)
+
+  def set_focus(self, cell):
+    """
+    Set the cell in focus.
+    cell -- widget or integer index into self.cells
+    """
+    ok = True
+    old_cell = self.focus_cell
+    with FocusTransition(self, lambda: GridFlow.set_focus(self, old_cell)) as transition:
+      if self.has_focus:
+        focus_w = self.get_focus()
+        if type(cell) == int:
+          focus_w_next = self.cells[cell]
+        else:
+          focus_w_next = cell
+        if focus_w and focus_w != focus_w_next and isinstance(focus_w, FocusEventWidget):
+          ok = focus_w.loose_focus()
+          if ok and isinstance(focus_w_next, FocusEventWidget):
+            ok = focus_w_next.gain_focus()
+    if ok:
+      GridFlow.set_focus(self, cell)
+      transition.commit()
+    else:
+      transition.cancel()
+
+  def get_focused_subwidget(self):
+    return self.get_focus()
+
+  def set_focused_subwidget(self, widget, events=True):
+    if events:
+      self.set_focus(widget)
+    else:
+      GridFlow.set_focus(self, widget)
+    return self.focus_cell is widget
+
+  def get_subwidgets(self):
+    return list(self.cells)
+
+  def render(self, size, focus=False):
+    return self.canvas_with_attr(self.__super.render(size, focus), focus)
+
+
+class OverlayMore(More, Overlay):
+  _default_sensitive_attr = 'body'
+  _default_unsensitive_attr = 'body'
+
+  def __init__(self, top_w, bottom_w, align, width, valign, height, min_width=None, min_height=None):
+    More.__init__(self)
+    Overlay.__init__(self, top_w, bottom_w, align, width, valign, height, min_width, min_height)
+
+  def selectable(self):
+    return Overlay.selectable(self) and self.sensitive
+
+  @property
+  def _handles_repeat(self):
+    return handles_repeat(self.top_w)
+
+  def get_focused_subwidget(self):
+    return self.top_w
+
+  def get_subwidgets(self):
+    return [self.top_w, self.bottom_w]
+
+  def get_focusable_subwidgets(self):
+    return [self.top_w]
+
+  def render(self, size, focus=False):
+    canvas = self.canvas_with_attr(self.__super.render(size, focus), focus)
+    # like mouse_event, only the top widget gets the mouse events
+    left, right, top, bottom = self.calculate_padding_filler(size, focus)
+    top_canvas = self.top_w.render(self.top_w_size(size, left, right, top, bottom), focus)
+    drop_mouse_targets(canvas, top_canvas.coords)
+    return canvas
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# coding: utf-8
+# vim:et:sta:sts=2:sw=2:ts=2:tw=0:
+"""
+Damage tracking: which parts of the screen changed since the last frame.
+"""
+from __future__ import unicode_literals
+
+
+def positioned_cviews(canvas):
+  """
+  Return a dict (col, row) -> cview of the canvases a canvas is made of, placed on the canvas.
+  A cview is a (trim_left, trim_top, cols, rows, attr_map, canvas) tuple, see CompositeCanvas.
+  """
+  if not hasattr(canvas, 'shards'):
+    return {(0, 0): (0, 0, canvas.cols(), canvas.rows(), None, canvas)}
+  cviews = {}
+  tails = []  # (col, cols, end row) of the cviews started in a previous shard
+  row = 0
+  for num_rows, shard_cviews in canvas.shards:
+    tails = [tail for tail in tails if tail[2] > row]
+    new_cviews = iter(shard_cviews)
+    new_tails = []
+    col = 0
+    # the cviews starting in this shard fill the gaps between the tails
+    for tail_col, tail_cols, tail_end in sorted(tails) + [(None, 0, 0)]:
+      while tail_col is None or col < tail_col:
+        try:
+          cv = next(new_cviews)
+        except StopIteration:
+          break
+        cviews[(col, row)] = cv
+        if cv[3] > num_rows:
+          new_tails.append((col, cv[2], row + cv[3]))
+        col += cv[2]
+      if tail_col is not None:
+        col = tail_col + tail_cols
+    tails.extend(new_tails)
+    row += num_rows
+  return cviews
+
+
+class DamageTracker(object):
+  """
+  Like CanvasCache, everything is stored on the class.
+  Once enabled, end_frame compares the canvas of a frame with the previous one, by identity of the
+  canvases they are made of, to give the rectangles of the screen that changed.
+  Unchanged widgets return their cached canvas, so a keystroke in an edit only damages its rows.
+  Only urwidm.fake_display.Screen redraws the damaged rows alone: the urwid screens (raw_display,
+  curses_display) are not wired to it.
+  """
+  enabled = False
+  dirty_rects = []
+  """ (col, row, cols, rows) rectangles that changed in the last frame """
+  _size = None
+  _canvas = None
+  _cviews = {}
+  _rows = None  # row -> [(col, top, cview)], built on demand from _cviews
+
+  @classmethod
+  def enable(cls, state=True):
+    cls.enabled = state
+    cls.reset()
+
+  @classmethod
+  def reset(cls):
+    """ Forget the last frame: the next one will be fully damaged. """
+    cls.dirty_rects = []
+    cls._size = None
+    cls._canvas = None
+    cls._cviews = {}
+    cls._rows = None
+
+  @classmethod
+  def end_frame(cls, canvas):
+    """
+    Compare canvas with the canvas of the previous frame, and return the dirty rectangles.
+    """
+    size = (canvas.cols(), canvas.rows())
+    if canvas is cls._canvas:
+      dirty = []
+    else:
+      cviews = positioned_cviews(canvas)
+      if size != cls._size:
+        dirty = [(0, 0) + size]
+      else:
+        dirty = []
+        last_cviews = cls._cviews
+        for pos, cv in cviews.items():
+          last_cv = last_cviews.get(pos)
+          if last_cv is None or last_cv[5] is not cv[5] or last_cv[:5] != cv[:5]:
+            dirty.append(pos + cv[2:4])
+      cls._cviews = cviews
+      cls._rows = None
+    cls._size = size
+    cls._canvas = canvas
+    cls.dirty_rects = dirty
+    return dirty
+
+  @classmethod
+  def dirty_rows(cls):
+    """ Return the sorted list of the rows that changed in the last frame. """
+    rows = set()
+    for col, row, cols, num_rows in cls.dirty_rects:
+      rows.update(range(row, row + num_rows))
+    return sorted(rows)
+
+  @classmethod
+  def row_content(cls, row):
+    """
+    Return the content of a row of the last frame, as a list of (attr, cs, text) like Canvas.content,
+    built from the canvases covering that row only.
+    """
+    if cls._rows is None:
+      cls._rows = {}
+      for (col, top), cv in sorted(cls._cviews.items()):
+        for r in range(top, top + cv[3]):
+          cls._rows.setdefault(r, []).append((col, top, cv))
+    content = []
+    for col, top, cv in cls._rows.get(row, []):
+      trim_left, trim_top, cols, rows, attr_map, canv = cv[:6]
+      for line in canv.content(trim_left, trim_top + row - top, cols, 1, attr_map):
+        content.extend(line)
+    return content
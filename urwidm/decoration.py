@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# coding: utf-8
+# vim:et:sta:sts=2:sw=2:ts=2:tw=0:
+"""
+More versions of the urwid decoration widgets.
+"""
+from __future__ import unicode_literals
+
+from urwid import WidgetDecoration, WidgetPlaceholder, AttrMap, AttrWrap, Padding, Filler, BoxAdapter, CompositeCanvas, LEFT, PACK
+from urwidm.keyrepeat import handles_repeat
+from urwidm.widget import FocusEventWidget, More
+
+
+class WidgetDecorationMore(More, WidgetDecoration):
+  def __init__(self, original_widget):
+    More.__init__(self)
+    WidgetDecoration.__init__(self, original_widget)
+
+  def _render_with_attr(self, size, focus=False):
+    canvas = self._original_widget.render(size, focus=focus)
+    return self.canvas_with_attr(CompositeCanvas(canvas), focus)
+
+  def render(self, size, focus=False):
+    return self._render_with_attr(size, focus)
+
+  def selectable(self):
+    return self._original_widget.selectable() and self.sensitive
+
+  @property
+  def _handles_repeat(self):
+    return handles_repeat(self._original_widget)
+
+  def _can_gain_focus(self):
+    if isinstance(self._original_widget, FocusEventWidget):
+      return self._original_widget._can_gain_focus()
+    else:
+      return FocusEventWidget._can_gain_focus(self)
+
+  def _can_loose_focus(self):
+    if isinstance(self._original_widget, FocusEventWidget):
+      return self._original_widget._can_loose_focus()
+    else:
+      return FocusEventWidget._can_loose_focus(self)
+
+  def get_focused_subwidget(self):
+    return self._original_widget
+
+  def get_subwidgets(self):
+    return [self._original_widget]
+
+
+class WidgetPlaceholderMore(WidgetDecorationMore, WidgetPlaceholder):
+  _default_sensitive_attr = 'body'
+  _default_unsensitive_attr = 'body'
+
+  def __init__(self, original_widget):
+    WidgetDecorationMore.__init__(self, original_widget)
+
+  def render(self, size, focus=False):
+    return self.canvas_with_attr(self.__super.render(size, focus=focus), focus)
+
+
+class AttrMapMore(WidgetDecorationMore, AttrMap):
+  def __init__(self, w, attr_map, focus_map=None):
+    WidgetDecorationMore.__init__(self, w)
+    AttrMap.__init__(self, w, attr_map, focus_map)
+
+  def render(self, size, focus=False):
+    return self.canvas_with_attr(AttrMap.render(self, size, focus), focus)
+
+
+class AttrWrapMore(WidgetDecorationMore, AttrWrap):
+  def __init__(self, w, attr, focus_attr=None):
+    WidgetDecorationMore.__init__(self, w)
+    AttrWrap.__init__(self, w, attr, focus_attr)
+
+  def render(self, size, focus=False):
+    return self.canvas_with_attr(AttrWrap.render(self, size, focus), focus)
+
+
+class PaddingMore(WidgetDecorationMore, Padding):
+  _default_sensitive_attr = 'body'
+  _default_unsensitive_attr = 'body'
+
+  def __init__(self, w, align=LEFT, width=PACK, min_width=None, left=0, right=0):
+    WidgetDecorationMore.__init__(self, w)
+    Padding.__init__(self, w, align, width, min_width, left, right)
+
+  def render(self, size, focus=False):
+    return self.canvas_with_attr(Padding.render(self, size, focus), focus)
+
+
+class FillerMore(WidgetDecorationMore, Filler):
+  _default_sensitive_attr = 'body'
+  _default_unsensitive_attr = 'body'
+
+  def __init__(self, body, valign="middle", height=None, min_height=None):
+    WidgetDecorationMore.__init__(self, body)
+    Filler.__init__(self, body, valign, height, min_height)
+
+  def render(self, size, focus=False):
+    return self.canvas_with_attr(Filler.render(self, size, focus), focus)
+
+
+class BoxAdapterMore(WidgetDecorationMore, BoxAdapter):
+  _default_sensitive_attr = 'body'
+  _default_unsensitive_attr = 'body'
+
+  def __init__(self, box_widget, height):
+    WidgetDecorationMore.__init__(self, box_widget)
+    BoxAdapter.__init__(self, box_widget, height)
+
+  def render(self, size, focus=False):
+    return self.canvas_with_attr(BoxAdapter.render(self, size, focus), focus)
@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# coding: utf-8
+# vim:et:sta:sts=2:sw=2:ts=2:tw=0:
+"""
+Dialogs, based on the work on curses_misc.py in Wicd.
+"""
+from __future__ import unicode_literals
+
+from urwid import Text, Divider, SimpleListWalker
+from urwid.util import is_mouse_event as urwid_is_mouse_event
+from urwidm import i18n
+from urwidm.futures import UIDispatcher
+from urwidm.hotkeys import HotkeyRegistry
+from urwidm.keyrepeat import coalesce_keys
+from urwidm.widget import WidgetWrapMore, EditMore, FocusRing, text_width
+from urwidm.wimp import ButtonMore
+from urwidm.decoration import AttrWrapMore, FillerMore
+from urwidm.container import FrameMore, PileMore, GridFlowMore, OverlayMore
+from urwidm.listbox import ListBoxMore
+from urwidm.mapped import MappedTextWalker
+from urwidm.graphics import LineBoxMore
+
+
+# This is a h4x3d copy of some of the code in Ian Ward's dialog.py example.
+def _input_timeouts(ui):
+  """ Return the input timeouts of the screen ui, as arguments of its set_input_timeouts, or None if unknown. """
+  if hasattr(ui, 'max_wait'):  # raw_display
+    return dict(max_wait=ui.max_wait, complete_wait=ui.complete_wait, resize_wait=ui.resize_wait)
+  if hasattr(ui, 'max_tenths'):  # curses_display
+    seconds = lambda tenths: None if tenths is None else tenths / 10.0
+    return dict(max_wait=seconds(ui.max_tenths), complete_wait=seconds(ui.complete_tenths), resize_wait=seconds(ui.resize_tenths))
+  return None
+
+
+class DialogExit(Exception):
+  """ Custom exception. """
+  pass
+
+
+class Dialog2(WidgetWrapMore):
+  """ Base class for other dialogs. """
+  def __init__(self, text, height, width, body=None):
+    self.buttons = None
+    self.width = int(width)
+    if width <= 0:
+      self.width = ('relative', 80)
+    self.height = int(height)
+    if height <= 0:
+      self.height = ('relative', 80)
+    self.body = body
+    if body is None:
+      # fill space with nothing
+      body = FillerMore(Divider(), 'top')
+    self.frame = FrameMore(body, focus_part='footer')
+    if text is not None:
+      self.frame.header = PileMore([
+        Text(text, align='right'),
+        Divider()
+      ])
+    w = AttrWrapMore(self.frame, 'body')
+    self.__super.__init__(w)
+
+  # buttons: tuple of name,exitcode or name,exitcode,accelerator key
+  def add_buttons(self, buttons):
+    """ Add buttons. """
+    l = []
+    maxlen = 0
+    for button in buttons:
+      name, exitcode = button[:2]
+      b = ButtonMore(name, self.button_press)
+      b.exitcode = exitcode
+      if len(button) > 2:
+        self.add_hotkey(button[2], lambda key, b=b: self.button_press(b))
+      b = AttrWrapMore(b, 'body', 'focus')
+      l.append(b)
+      maxlen = max(text_width(name), maxlen)
+    maxlen += 4  # because of '< ... >'
+    self.buttons = GridFlowMore(l, maxlen, 3, 1, 'center')
+    self.frame.footer = PileMore([
+      Divider(),
+      self.buttons
+    ], focus_item=1)
+
+  def button_press(self, button):
+    """ Handle button press. """
+    raise DialogExit(button.exitcode)
+
+  def add_hotkey(self, key, callback, priority=0):
+    """ Call callback(key) when key is pressed while the dialog runs, before the widgets get it. """
+    HotkeyRegistry.register(key, callback, self, priority)
+
+  def run(self, ui, parent):
+    """ Run the UI. """
+    ui.set_mouse_tracking()
+    # the screen may belong to a MainLoop, which gets its timeouts back
+    timeouts = _input_timeouts(ui)
+    ui.set_input_timeouts(max_wait=UIDispatcher.poll_interval)
+    size = ui.get_cols_rows()
+    overlay = OverlayMore(
+      LineBoxMore(self._w),
+      parent, 'center', self.width,
+      'middle', self.height
+    )
+    focus_ring = FocusRing(self._w)
+    HotkeyRegistry.push(self)
+    try:
+      while True:
+        canvas = overlay.render(size, focus=True)
+        ui.draw_screen(size, canvas)
+        keys = []
+        # stop waiting for input to redraw when focus handlers answered
+        while not keys and not UIDispatcher.poll():
+          # do not wait while there are idle tasks, run them when there is no input
+          idle = UIDispatcher.idle_pending()
+          ui.set_input_timeouts(max_wait=0 if idle else UIDispatcher.poll_interval)
+          keys = ui.get_input()
+          if idle and not keys:
+            UIDispatcher.run_idle()
+        # a held navigation key moves at once
+        for k in coalesce_keys(keys, self._w):
+          if urwid_is_mouse_event(k):
+            event, button, col, row = k
+            overlay.mouse_event(size, event, button, col, row, focus=True)
+          elif not HotkeyRegistry.dispatch(k):
+            if k == 'window resize':
+              size = ui.get_cols_rows()
+            k = self._w.keypress(size, k)
+            if k:
+              k = focus_ring.keypress(k)
+            if k == 'esc':
+              raise DialogExit(-1)
+            if k:
+              self.unhandled_key(size, k)
+    except DialogExit, e:
+      return self.on_exit(e.args[0])
+    finally:
+      HotkeyRegistry.pop(self)
+      if timeouts is not None:
+        ui.set_input_timeouts(**timeouts)
+
+  def on_exit(self, exitcode):
+    """ Handle dialog exit. """
+    return exitcode, ""
+
+  def unhandled_key(self, size, key):
+    """ Handle keypresses. """
+    pass
+
+
+class TextDialog(Dialog2):
+  """ Simple dialog with text and "OK" button. """
+  def __init__(self, text, height, width, header=None, align='left', buttons=None):
+    if not buttons:
+      buttons = (i18n['ok'], 1)
+    body = ListBoxMore(self._text_walker(text))
+    body = AttrWrapMore(body, 'body')
+    Dialog2.__init__(self, header, height + 2, width + 2, body)
+    if type(buttons) == list:
+      self.add_buttons(buttons)
+    else:
+      self.add_buttons([buttons])
+    self.frame.set_focus('footer')
+
+  def _text_walker(self, text):
+    return SimpleListWalker([Text(text)])
+
+  def unhandled_key(self, size, k):
+    """ Handle keys. """
+    if k in ('up', 'page up', 'down', 'page down'):
+      self.frame.set_focus('body')
+      self._w.keypress(size, k)
+      self.frame.set_focus('footer')
+
+
+class MappedTextDialog(TextDialog):
+  """
+  TextDialog viewing a file, given by its path, or a buffer, too large to be kept in a Text.
+  See MappedTextWalker: the file is memory-mapped and only the lines in view are laid out.
+  """
+  def __init__(self, source, height, width, header=None, align='left', buttons=None, encoding='utf8'):
+    self.encoding = encoding
+    self.__super.__init__(source, height, width, header, align, buttons)
+
+  def _text_walker(self, source):
+    self.walker = MappedTextWalker(source, self.encoding)
+    return self.walker
+
+  def on_exit(self, exitcode):
+    self.walker.close()
+    return self.__super.on_exit(exitcode)
+
+
+class InputDialog(Dialog2):
+  """ Simple dialog with text and entry. """
+  def __init__(self, text, height, width, ok_name=None, edit_text=''):
+    if not ok_name:
+      ok_name = i18n['ok']
+    self.edit = EditMore(wrap='clip', edit_text=edit_text)
+    body = ListBoxMore(SimpleListWalker([self.edit]))
+    body = AttrWrapMore(body, 'editbx', 'editfc')
+    Dialog2.__init__(self, text, height, width, body)
+    self.frame.set_focus('body')
+    self.add_buttons([(ok_name, 0), (i18n['cancel'], -1)])
+
+  def unhandled_key(self, size, k):
+    """ Handle keys. """
+    if k in ('up', 'page up'):
+      self.frame.set_focus('body')
+    if k in ('down', 'page down'):
+      self.frame.set_focus('footer')
+    if k == 'enter':
+      # pass enter to the "ok" button
+      self.frame.set_focus('footer')
+      self._w.keypress(size, k)
+
+  def on_exit(self, exitcode):
+    """ Handle dialog exit. """
+    return exitcode, self.edit.get_edit_text()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# coding: utf-8
+# vim:et:sta:sts=2:sw=2:ts=2:tw=0:
+"""
+In-memory screen, to run MainLoop and Dialog2 without a terminal.
+"""
+from __future__ import unicode_literals
+
+import os
+import time
+from collections import deque
+from urwid import BaseScreen, ExitMainLoop
+from urwid import util as urwid_util
+from urwidm.damage import DamageTracker
+
+
+class ScreenFrame(object):
+  """
+  A drawn canvas:
+    text  = list of rows, as unicode strings
+    attrs = list of rows, each one a list of (attr, number of columns) runs
+  """
+  __slots__ = ('text', 'attrs', 'cursor')
+
+  def __init__(self, text, attrs, cursor):
+    self.text = text
+    self.attrs = attrs
+    self.cursor = cursor
+
+  def __eq__(self, other):
+    return isinstance(other, ScreenFrame) and self.text == other.text and self.attrs == other.attrs and self.cursor == other.cursor
+
+  def __ne__(self, other):
+    return not self.__eq__(other)
+
+
+def _convert_row(row, encoding):
+  """ Return (text, attr runs) of a row of canvas content. """
+  line = []
+  runs = []
+  for attr, cs, run in row:
+    if isinstance(run, bytes):
+      run = run.decode(encoding, 'replace')
+    line.append(run)
+    width = urwid_util.calc_width(run, 0, len(run))
+    if runs and runs[-1][0] == attr:
+      runs[-1] = (attr, runs[-1][1] + width)
+    else:
+      runs.append((attr, width))
+  return ''.join(line), runs
+
+
+def canvas_to_frame(canvas):
+  """ Convert a canvas to a ScreenFrame. """
+  encoding = getattr(urwid_util, '_target_encoding', 'ascii')
+  text = []
+  attrs = []
+  for row in canvas.content():
+    line, runs = _convert_row(row, encoding)
+    text.append(line)
+    attrs.append(runs)
+  return ScreenFrame(text, attrs, canvas.cursor)
+
+
+def damaged_frame(frame, canvas):
+  """
+  Return a copy of the ScreenFrame frame with only the rows damaged by canvas redrawn.
+  DamageTracker.end_frame(canvas) must have been called.
+  """
+  encoding = getattr(urwid_util, '_target_encoding', 'ascii')
+  text = list(frame.text)
+  attrs = list(frame.attrs)
+  for row in DamageTracker.dirty_rows():
+    text[row], attrs[row] = _convert_row(DamageTracker.row_content(row), encoding)
+  return ScreenFrame(text, attrs, canvas.cursor)
+
+
+class Screen(BaseScreen):
+  """
+  Screen that feeds scripted input and captures the drawn canvases.
+  ExitMainLoop is raised by get_input when the scripted input is exhausted.
+  When DamageTracker is enabled, only the damaged rows are redrawn.
+  A MainLoop watches its input descriptor in its event loop, like a terminal: it is readable once a frame
+  was drawn after the last input read, while scripted input remains or until the end of the script is read.
+  """
+  def __init__(self, size=(80, 24), keep_frames=False):
+    """
+    size       : (cols, rows) of the screen
+    keep_frames: keep every drawn frame in self.frames, not only the last one
+    """
+    BaseScreen.__init__(self)
+    self.size = size
+    self.keep_frames = keep_frames
+    self._input = deque()
+    self._pipe = None
+    self._readable = False
+    self._drawn = True  # a frame was drawn since the last input read
+    self._script_end = False  # the end of the scripted input is not read yet
+    self.reset_stats()
+
+  def reset_stats(self):
+    self.frames = []
+    self.last_frame = None
+    self.frame_count = 0
+    self.redrawn_rows = 0
+    self.redundant_frames = 0
+    self.draw_time = 0.0
+    self.keystroke_times = []
+    self._input_time = None
+    self._first_draw = None
+    self._last_draw = None
+    self._last_size = None
+
+  def script_input(self, *batches):
+    """
+    Queue input, each batch being a list of keys or mouse events returned by one call to get_input.
+    A single key or mouse event is accepted as a batch of one.
+    """
+    for batch in batches:
+      if not isinstance(batch, list):
+        batch = [batch]
+      self._input.append(batch)
+      self._script_end = True
+    self._update_readable()
+
+  def get_input_descriptors(self):
+    if self._pipe is None:
+      self._pipe = os.pipe()
+      self._readable = False
+      self._update_readable()
+    return [self._pipe[0]]
+
+  def _update_readable(self):
+    if self._pipe is None:
+      return
+    readable = self._drawn and self._script_end
+    if readable and not self._readable:
+      os.write(self._pipe[1], b'.')
+    elif self._readable and not readable:
+      os.read(self._pipe[0], 1)
+    self._readable = readable
+
+  def stop(self):
+    BaseScreen.stop(self)
+    if self._pipe is not None:
+      os.close(self._pipe[0])
+      os.close(self._pipe[1])
+      self._pipe = None
+
+  def run_wrapper(self, fn):
+    self.start()
+    try:
+      return fn()
+    finally:
+      self.stop()
+
+  def set_mouse_tracking(self):
+    pass
+
+  def set_input_timeouts(self, max_wait=None, complete_wait=0.125, resize_wait=0.125):
+    pass
+
+  def clear(self):
+    self.last_frame = None
+    DamageTracker.reset()
+
+  def get_cols_rows(self):
+    return self.size
+
+  def _next_input(self):
+    if not self._input:
+      self._script_end = False
+      self._update_readable()
+      raise ExitMainLoop()
+    return self._input.popleft()
+
+  def get_input(self, raw_keys=False):
+    keys = self._next_input()
+    self._input_time = time.time()
+    self._drawn = False
+    self._update_readable()
+    if raw_keys:
+      return keys, []
+    return keys
+
+  def get_input_nonblocking(self):
+    keys, raw = self.get_input(True)
+    return None, keys, raw
+
+  def draw_screen(self, size, canvas):
+    start = time.time()
+    if DamageTracker.enabled and self.last_frame is not None and size == self._last_size:
+      DamageTracker.end_frame(canvas)
+      frame = damaged_frame(self.last_frame, canvas)
+      self.redrawn_rows += len(DamageTracker.dirty_rows())
+    else:
+      if DamageTracker.enabled:
+        DamageTracker.end_frame(canvas)
+      frame = canvas_to_frame(canvas)
+      self.redrawn_rows += len(frame.text)
+    if frame == self.last_frame:
+      self.redundant_frames += 1
+    self.last_frame = frame
+    self._last_size = size
+    if self.keep_frames:
+      self.frames.append(frame)
+    self.frame_count += 1
+    self._drawn = True
+    self._update_readable()
+    end = time.time()
+    self.draw_time += end - start
+    if self._first_draw is None:
+      self._first_draw = start
+    self._last_draw = end
+    if self._input_time is not None:
+      self.keystroke_times.append(end - self._input_time)
+      self._input_time = None
+
+  def fps(self):
+    """ Return the number of frames drawn per second, or None if nothing was drawn. """
+    if not self.frame_count or self._last_draw == self._first_draw:
+      return None
+    return self.frame_count / (self._last_draw - self._first_draw)
@@ -0,0 +1,326 @@
+#!/usr/bin/env python
+# coding: utf-8
+# vim:et:sta:sts=2:sw=2:ts=2:tw=0:
+"""
+Futures, a thread pool, and a queue and a dispatcher running callables on the UI thread.
+Used to answer focus events without blocking the input.
+"""
+from __future__ import unicode_literals
+
+import os
+import select
+import threading
+import time
+from collections import deque
+try:
+  from queue import Queue
+except ImportError:
+  from Queue import Queue
+
+
+class FutureTimeout(Exception):
+  pass
+
+
+class FutureCancelled(Exception):
+  pass
+
+
+def is_future(obj):
+  """ Duck typing: True for Future or concurrent.futures.Future (the futures backport), whose result takes a timeout. """
+  return hasattr(obj, 'add_done_callback') and hasattr(obj, 'done')
+
+
+def future_answer(future, timeout):
+  """ Wait for the answer of a handler given as a future, refuse on errors and timeout. """
+  try:
+    return bool(future.result(timeout))
+  except Exception:
+    return False
+
+
+class Future(object):
+  """
+  Minimal thread-safe future, in the way of concurrent.futures.Future.
+  The done callbacks are called in the thread setting the result.
+  """
+  def __init__(self):
+    self._condition = threading.Condition()
+    self._done = False
+    self._cancelled = False
+    self._result = None
+    self._exception = None
+    self._callbacks = []
+
+  def done(self):
+    return self._done
+
+  def cancelled(self):
+    return self._cancelled
+
+  def cancel(self):
+    """ Cancel the future if it is not done yet, return True if it is cancelled. """
+    with self._condition:
+      if self._done:
+        return self._cancelled
+      self._cancelled = True
+    self._finish()
+    return True
+
+  def set_result(self, result):
+    with self._condition:
+      if self._done:
+        return
+      self._result = result
+    self._finish()
+
+  def set_exception(self, exception):
+    with self._condition:
+      if self._done:
+        return
+      self._exception = exception
+    self._finish()
+
+  def _finish(self):
+    with self._condition:
+      self._done = True
+      callbacks, self._callbacks = self._callbacks, []
+      self._condition.notify_all()
+    for callback in callbacks:
+      callback(self)
+
+  def add_done_callback(self, fn):
+    with self._condition:
+      if not self._done:
+        self._callbacks.append(fn)
+        return
+    fn(self)
+
+  def _wait(self, timeout):
+    with self._condition:
+      if not self._done:
+        self._condition.wait(timeout)
+      if not self._done:
+        raise FutureTimeout()
+      if self._cancelled:
+        raise FutureCancelled()
+
+  def exception(self, timeout=None):
+    self._wait(timeout)
+    return self._exception
+
+  def result(self, timeout=None):
+    self._wait(timeout)
+    if self._exception is not None:
+      raise self._exception
+    return self._result
+
+
+class ThreadPool(object):
+  """ Fixed number of daemon threads running the submitted callables. """
+  def __init__(self, size=4):
+    self.size = size
+    self._queue = Queue()
+    self._threads = []
+
+  def _work(self):
+    while True:
+      future, fn, args, kwargs = self._queue.get()
+      if future.cancelled():
+        continue
+      try:
+        future.set_result(fn(*args, **kwargs))
+      except Exception as e:
+        future.set_exception(e)
+
+  def submit(self, fn, *args, **kwargs):
+    """ Run fn(*args, **kwargs) in a thread of the pool, return a Future of its result. """
+    if len(self._threads) < self.size:
+      thread = threading.Thread(target=self._work)
+      thread.daemon = True
+      thread.start()
+      self._threads.append(thread)
+    future = Future()
+    self._queue.put((future, fn, args, kwargs))
+    return future
+
+
+default_pool = ThreadPool()
+
+
+def in_thread(fn, pool=None):
+  """
+  Return a function calling fn in a thread of pool (default_pool if None) and returning a Future.
+  Example: connect_signal(edit, 'focuslost', in_thread(validate))
+  """
+  def run_in_thread(*args, **kwargs):
+    return (pool or default_pool).submit(fn, *args, **kwargs)
+  return run_in_thread
+
+
+class UpdateQueue(object):
+  """
+  Thread-safe queue of updates, callables run on the UI thread: widgets are not thread safe, so worker
+  threads post their changes here instead of applying them.
+  Once attached to a MainLoop, it is drained in the MainLoop thread when woken up through a pipe,
+  which is only written once per batch: all the updates posted since the last batch are applied
+  at once, then the screen is drawn once for them.
+  """
+  def __init__(self):
+    self._queue = deque()
+    self._lock = threading.Lock()
+    self._woken = False
+    self._loop = None
+    self._pipe = None
+
+  def __len__(self):
+    return len(self._queue)
+
+  def attach(self, loop):
+    """ Let the MainLoop loop drain the queue as soon as updates are posted. """
+    self.detach()
+    self._loop = loop
+    self._pipe = loop.watch_pipe(self._wake_up)
+    if self._queue:
+      self._wake()
+
+  def detach(self):
+    if self._pipe is not None:
+      self._loop.remove_watch_pipe(self._pipe)
+      os.close(self._pipe)
+    self._loop = None
+    self._pipe = None
+    self._woken = False
+
+  def _wake_up(self, data):
+    # the MainLoop only draws when idle, which never happens while updates keep coming
+    if self.drain():
+      self._loop.draw_screen()
+    return True
+
+  def _wake(self):
+    with self._lock:
+      if self._woken or self._pipe is None:
+        return
+      self._woken = True
+    os.write(self._pipe, b'.')
+
+  def post(self, fn, *args):
+    """ Run fn(*args) on the UI thread. May be called from any thread. """
+    self._queue.append((fn, args))
+    self._wake()
+
+  def drain(self):
+    """ Run the updates posted so far, return how many were run. Must be called from the UI thread. """
+    with self._lock:
+      self._woken = False
+    count = len(self._queue)
+    for i in range(count):
+      fn, args = self._queue.popleft()
+      fn(*args)
+    return count
+
+
+class UIDispatcher(object):
+  """
+  Callables to run on the UI thread. Like CanvasCache, everything is stored on the class.
+  call_soon may be called from any thread, it posts to the UpdateQueue updates. The queued callables
+  are run by poll, which is called by a MainLoop given to attach (woken up through a pipe) or by Dialog2.run.
+  The idle tasks are run by slices when no input waits: by an alarm armed each time the MainLoop goes idle,
+  or by Dialog2.run when get_input returns nothing.
+  """
+  poll_interval = 0.1
+  """ seconds between two polls when waiting for input in Dialog2.run """
+  idle_slice = 0.005
+  """ seconds an idle task should work at most before giving the input a chance """
+  updates = UpdateQueue()
+  _timers = []
+  _idle = deque()
+  _loop = None
+  _idle_handle = None
+  _idle_alarm = None
+
+  @classmethod
+  def attach(cls, loop):
+    """ Let the MainLoop loop run the callables as soon as they are queued, and the idle tasks when idle. """
+    cls.detach()
+    cls._loop = loop
+    cls.updates.attach(loop)
+    cls._idle_handle = loop.event_loop.enter_idle(cls._arm_idle)
+    cls._arm_idle()
+
+  @classmethod
+  def detach(cls):
+    cls.updates.detach()
+    if cls._loop is not None:
+      cls._loop.event_loop.remove_enter_idle(cls._idle_handle)
+      if cls._idle_alarm is not None:
+        cls._loop.remove_alarm(cls._idle_alarm)
+    cls._loop = None
+    cls._idle_handle = None
+    cls._idle_alarm = None
+
+  @classmethod
+  def call_soon(cls, fn, *args):
+    cls.updates.post(fn, *args)
+
+  @classmethod
+  def call_later(cls, delay, fn, *args):
+    """ Run fn(*args) in delay seconds, must be called from the UI thread. """
+    cls._timers.append((time.time() + delay, fn, args))
+    if cls._loop is not None:
+      cls._loop.set_alarm_in(delay, lambda loop, data: cls.poll())
+
+  @classmethod
+  def call_when_idle(cls, fn, *args):
+    """
+    Run fn(*args) when no input waits, again as long as it returns True, must be called from the UI thread.
+    A long task does its work by slices of about idle_slice seconds, returning True until it is done.
+    """
+    cls._idle.append((fn, args))
+    cls._arm_idle()
+
+  @classmethod
+  def idle_pending(cls):
+    return bool(cls._idle)
+
+  @classmethod
+  def run_idle(cls):
+    """ Run one slice of the first idle task, return True if idle tasks are left. """
+    if cls._idle:
+      fn, args = cls._idle.popleft()
+      if fn(*args):
+        cls._idle.append((fn, args))
+    return bool(cls._idle)
+
+  @classmethod
+  def _arm_idle(cls):
+    if cls._idle and cls._loop is not None and cls._idle_alarm is None:
+      cls._idle_alarm = cls._loop.set_alarm_in(0, cls._idle_alarm_rang)
+
+  @classmethod
+  def _idle_alarm_rang(cls, loop, data):
+    # the alarm rings once the pending input is read: check there is none waiting since
+    cls._idle_alarm = None
+    fds = loop.screen.get_input_descriptors() if hasattr(loop.screen, 'get_input_descriptors') else []
+    if not fds or not select.select(fds, [], [], 0)[0]:
+      cls.run_idle()
+    # armed again when the loop is idle
+
+  @classmethod
+  def pending(cls):
+    return bool(cls.updates or cls._timers)
+
+  @classmethod
+  def poll(cls):
+    """ Run the queued callables and the expired timers, return how many were run. """
+    count = cls.updates.drain()
+    if cls._timers:
+      now = time.time()
+      expired = [timer for timer in cls._timers if timer[0] <= now]
+      if expired:
+        cls._timers = [timer for timer in cls._timers if timer[0] > now]
+        for deadline, fn, args in expired:
+          fn(*args)
+          count += 1
+    return count
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# coding: utf-8
+# vim:et:sta:sts=2:sw=2:ts=2:tw=0:
+"""
+More versions of the urwid graphic widgets.
+"""
+from __future__ import unicode_literals
+
+from urwid import LineBox, WidgetWrap, Divider, SolidFill
+from urwidm.widget import TextMore
+from urwidm.decoration import WidgetDecorationMore, AttrMapMore
+from urwidm.container import PileMore, ColumnsMore
+
+
+class LineBoxMore(WidgetDecorationMore, LineBox):
+  def __init__(self, original_widget, title="", tlcorner='┌', tline='─', lline='│', trcorner='┐', blcorner='└', rline='│', bline='─', brcorner='┘'):
+    """See LineBox"""
+    self._tline, self._bline = AttrMapMore(Divider(tline), None), AttrMapMore(Divider(bline), None)
+    self._lline, self._rline = AttrMapMore(SolidFill(lline), None), AttrMapMore(SolidFill(rline), None)
+    self._tlcorner, self._trcorner = TextMore(tlcorner), TextMore(trcorner)
+    self._blcorner, self._brcorner = TextMore(blcorner), TextMore(brcorner)
+    self.title_widget = TextMore(self.format_title(title))
+    self.tline_widget = ColumnsMore([
+      self._tline,
+      ('flow', self.title_widget),
+      self._tline,
+    ])
+    top = ColumnsMore([
+      ('fixed', 1, self._tlcorner),
+      self.tline_widget,
+      ('fixed', 1, self._trcorner)
+    ])
+    middle = ColumnsMore([
+      ('fixed', 1, self._lline),
+      original_widget,
+      ('fixed', 1, self._rline),
+    ], box_columns=[0, 2], focus_column=1)
+    bottom = ColumnsMore([
+      ('fixed', 1, self._blcorner), self._bline, ('fixed', 1, self._brcorner)
+    ])
+    pile = PileMore([('flow', top), middle, ('flow', bottom)], focus_item=1)
+    WidgetDecorationMore.__init__(self, original_widget)
+    WidgetWrap.__init__(self, pile)
+
+  def render(self, size, focus=False):
+    for w in (self._tline, self._bline, self._lline, self._rline, self._tlcorner, self._trcorner, self._blcorner, self._brcorner, self.title_widget):
+      if self.sensitive:
+        w.attr = self.attr[0]
+      else:
+        w.attr = self.attr[1]
+    return self.canvas_with_attr(LineBox.render(self, size, focus), focus)
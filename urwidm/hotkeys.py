@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# coding: utf-8
+# vim:et:sta:sts=2:sw=2:ts=2:tw=0:
+"""
+Hotkey registry: keys handled before the widget tree, whatever its depth.
+"""
+from __future__ import unicode_literals
+
+
+class HotkeyRegistry(object):
+  """
+  Like CanvasCache, the registry is the class itself.
+  A hotkey belongs to a scope: None for the main screen, or an object like the Dialog2 showing it,
+  which keeps its hotkeys in its _hotkeys attribute, so that they go with it.
+  The scopes form a stack, the last pushed being the active overlay: a key is looked up in it, then in
+  the scopes below it down to the first modal one, the main screen being at the bottom.
+  Among the hotkeys found, the highest priority wins, then the nearest scope, then the last registered.
+  Use input_filter as the input_filter of a MainLoop, Dialog2 dispatches the keys itself.
+  """
+  _main = {}  # key -> [(priority, order, callback)], best first
+  _scopes = []  # (scope, modal), the active one last
+  _order = 0
+
+  @classmethod
+  def _table(cls, scope, create=False):
+    if scope is None:
+      return cls._main
+    table = getattr(scope, '_hotkeys', None)
+    if table is None and create:
+      table = scope._hotkeys = {}
+    return table
+
+  @classmethod
+  def register(cls, key, callback, scope=None, priority=0):
+    """ Call callback(key) when key is pressed while scope is active. It may answer False to pass the key on. """
+    cls._order += 1
+    bindings = cls._table(scope, True).setdefault(key, [])
+    bindings.append((priority, cls._order, callback))
+    bindings.sort(key=lambda binding: binding[:2], reverse=True)
+
+  @classmethod
+  def unregister(cls, key, callback=None, scope=None):
+    """ Remove the hotkeys key of scope, only the ones calling callback if given. """
+    table = cls._table(scope) or {}
+    bindings = [binding for binding in table.get(key, []) if callback is not None and binding[2] != callback]
+    if bindings:
+      table[key] = bindings
+    else:
+      table.pop(key, None)
+
+  @classmethod
+  def clear(cls, scope=None):
+    """ Remove all the hotkeys of scope. """
+    table = cls._table(scope)
+    if table:
+      table.clear()
+
+  @classmethod
+  def push(cls, scope, modal=True):
+    """ Make scope the active one. When modal, the hotkeys of the scopes below are hidden. """
+    cls._scopes.append((scope, modal))
+
+  @classmethod
+  def pop(cls, scope):
+    """ Remove the last push of scope. """
+    for i in range(len(cls._scopes) - 1, -1, -1):
+      if cls._scopes[i][0] is scope:
+        del cls._scopes[i]
+        return
+
+  @classmethod
+  def lookup(cls, key):
+    """ Return the callback of the hotkey key in the active scopes, or None. """
+    best = None
+    for scope, modal in reversed(cls._scopes):
+      table = cls._table(scope)
+      bindings = table and table.get(key)
+      if bindings and (best is None or bindings[0][0] > best[0]):
+        best = bindings[0]
+      if modal:
+        break
+    else:
+      bindings = cls._main.get(key)
+      if bindings and (best is None or bindings[0][0] > best[0]):
+        best = bindings[0]
+    return best and best[2]
+
+  @classmethod
+  def dispatch(cls, key):
+    """ Call the hotkey key, return True if it handled the key. """
+    callback = cls.lookup(key)
+    return callback is not None and callback(key) is not False
+
+  @classmethod
+  def input_filter(cls, keys, raw):
+    """ MainLoop input_filter: return the keys left once the hotkeys handled theirs. """
+    return [key for key in keys if not isinstance(key, basestring) or not cls.dispatch(key)]
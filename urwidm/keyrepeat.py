@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# coding: utf-8
+# vim:et:sta:sts=2:sw=2:ts=2:tw=0:
+"""
+Key repeat: the runs of a same navigation key in an input batch, like when a key is held down, handled as one move.
+"""
+from __future__ import unicode_literals
+
+from urwid.command_map import command_map
+from urwidm.hotkeys import HotkeyRegistry
+
+NAVIGATION_COMMANDS = frozenset(['cursor up', 'cursor down', 'cursor page up', 'cursor page down'])
+
+
+class RepeatedKey(unicode):
+  """
+  A key pressed several times in a row, presses being how many. It is equal to the key, so it is only given to the widgets
+  handling repeats (see handles_repeat), the others get the key count times, see keypress_repeated.
+  """
+  def __new__(cls, key, count):
+    self = unicode.__new__(cls, key)
+    self.presses = count
+    return self
+
+  def __repr__(self):
+    return 'RepeatedKey({0!r}, {1})'.format(unicode(self), self.presses)
+
+
+def repeated(key, count):
+  """ Return key pressed count times: a RepeatedKey, or key itself for one press. """
+  if count > 1:
+    return RepeatedKey(key, count)
+  return key
+
+
+def repeat_count(key):
+  """ Return how many presses key stands for. """
+  return getattr(key, 'presses', 1)
+
+
+def handles_repeat(widget):
+  """
+  True if the keypress of widget handles a RepeatedKey, or passes it unchanged to a widget handling it,
+  like the decorations do. Containers handling it give it to the widget in focus the same way.
+  """
+  return getattr(widget, '_handles_repeat', False)
+
+
+def keypress_repeated(widget, size, key, count):
+  """
+  Give count presses of key to widget: at once if it handles repeats, one by one otherwise.
+  Return None if it handled them all, or the key it did not handle, repeated for the presses left.
+  """
+  if count > 1 and handles_repeat(widget):
+    return widget.keypress(size, RepeatedKey(key, count))
+  while count:
+    key_left = widget.keypress(size, key)
+    if key_left is not None:
+      # an unhandled press changed nothing, the next ones would be left the same way
+      return repeated(key_left, count)
+    count -= 1
+  return None
+
+
+def coalesce_keys(keys, widget=None):
+  """
+  Return the input keys with each run of a same navigation key replaced by a RepeatedKey, if widget,
+  the one getting the keys, handles repeats. Navigation keys do not change which widgets a key goes
+  through, so only the keys before any other key or mouse event are coalesced. Hotkeys are left as they are.
+  As input filter of a MainLoop: input_filter=lambda keys, raw: coalesce_keys(keys, topmost_widget)
+  """
+  if widget is not None and not handles_repeat(widget):
+    return keys
+  coalesced = []
+  for i, key in enumerate(keys):
+    if not isinstance(key, basestring) or command_map[key] not in NAVIGATION_COMMANDS or HotkeyRegistry.lookup(key):
+      return coalesced + list(keys[i:])
+    if coalesced and key == coalesced[-1]:
+      coalesced[-1] = RepeatedKey(key, repeat_count(coalesced[-1]) + 1)
+    else:
+      coalesced.append(key)
+  return coalesced
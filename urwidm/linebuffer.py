@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# coding: utf-8
+# vim:et:sta:sts=2:sw=2:ts=2:tw=0:
+"""
+Line buffer: the text of a large document stored as blocks of lines, for BufferEditMore.
+"""
+from __future__ import unicode_literals
+
+
+class LineBuffer(object):
+  """
+  Text stored as a list of blocks of at most 2 * block_size lines, without their newline.
+  An edit only rebuilds the lines and the blocks it touches: typing in a line copies this line
+  and not the whole text, and finding an offset walks the blocks, not the lines.
+  The whole text is only joined when asked for, and kept until the next edit.
+  """
+  block_size = 128
+
+  def __init__(self, text=""):
+    self._newline = b'\n' if isinstance(text, bytes) else '\n'
+    self._blocks = []
+    self._sizes = []  # characters in each block, counting one newline per line
+    self._text = None
+    self._replace_blocks(0, 0, text.split(self._newline))
+    self._len = len(text)
+    self._text = text
+
+  def __len__(self):
+    return self._len
+
+  def get_text(self):
+    if self._text is None:
+      self._text = self._newline.join(self.lines())
+    return self._text
+
+  def line_count(self):
+    return sum(len(block) for block in self._blocks)
+
+  def lines(self):
+    """ Iterate over the lines, without their newline. """
+    for block in self._blocks:
+      for line in block:
+        yield line
+
+  def line(self, index):
+    for block in self._blocks:
+      if index < len(block):
+        return block[index]
+      index -= len(block)
+    raise IndexError(index)
+
+  def blocks(self):
+    """ Iterate over the blocks of lines. A block is never changed: an edit replaces it. """
+    return iter(self._blocks)
+
+  def find(self, pos):
+    """ Return (block index, line index in the block, column) of the offset pos. """
+    if pos < 0 or pos > self._len:
+      raise IndexError(pos)
+    last = len(self._blocks) - 1
+    for b, size in enumerate(self._sizes):
+      if pos < size or b == last:
+        break
+      pos -= size
+    for i, line in enumerate(self._blocks[b]):
+      if pos <= len(line):
+        return b, i, pos
+      pos -= len(line) + 1
+
+  def locate(self, pos):
+    """ Return (line index, column) of the offset pos. """
+    b, i, col = self.find(pos)
+    return sum(len(block) for block in self._blocks[:b]) + i, col
+
+  def line_at(self, pos):
+    """ Return (line, column) of the offset pos. """
+    b, i, col = self.find(pos)
+    return self._blocks[b][i], col
+
+  def offset(self, index):
+    """ Return the offset of the start of the line index. """
+    pos = 0
+    for block, size in zip(self._blocks, self._sizes):
+      if index < len(block):
+        return pos + sum(len(line) + 1 for line in block[:index])
+      index -= len(block)
+      pos += size
+    raise IndexError(index)
+
+  def _replace_blocks(self, start, end, lines):
+    """ Replace the blocks start to end excluded by blocks made of lines. """
+    size = self.block_size
+    if len(lines) <= 2 * size:
+      blocks = [lines]
+    else:
+      blocks = [lines[i:i + size] for i in range(0, len(lines), size)]
+    self._blocks[start:end] = blocks
+    self._sizes[start:end] = [sum(len(line) + 1 for line in block) for block in blocks]
+    self._text = None
+
+  def replace(self, start, end, text):
+    """ Replace the characters from the offset start to end excluded by text. """
+    b1, i1, col1 = self.find(start)
+    b2, i2, col2 = self.find(end)
+    lines = [line for block in self._blocks[b1:b2 + 1] for line in block]
+    i2 += sum(len(block) for block in self._blocks[b1:b2])
+    new_lines = (lines[i1][:col1] + text + lines[i2][col2:]).split(self._newline)
+    lines[i1:i2 + 1] = new_lines
+    self._replace_blocks(b1, b2 + 1, lines)
+    self._len += len(text) - (end - start)
+
+  def insert(self, pos, text):
+    self.replace(pos, pos, text)
+
+  def delete(self, start, end):
+    self.replace(start, end, self._newline[:0])
@@ -0,0 +1,403 @@
+#!/usr/bin/env python
+# coding: utf-8
+# vim:et:sta:sts=2:sw=2:ts=2:tw=0:
+"""
+More version of the urwid ListBox.
+"""
+from __future__ import unicode_literals
+
+import time
+from collections import deque, namedtuple
+from urwid import ListBox, ListWalker, Widget, Text
+from urwid.util import is_mouse_press as urwid_is_mouse_press
+from urwidm.futures import UIDispatcher
+from urwidm.keyrepeat import repeat_count, repeated
+from urwidm.widget import FocusEventWidget, FocusTransition, More
+
+
+class ScrollState(namedtuple(str('ScrollState'), str('position offset_rows inset_fraction pref_col'))):
+  """
+  Focus position and scrolling of a ListBoxMore, see get_scroll_state. A tuple, which can be pickled
+  when the position can, to restore a view in another session.
+  """
+  __slots__ = ()
+
+
+class ListBoxMore(More, ListBox):
+  """
+  With prefetch_rows, the rows just above and below the view are rendered ahead, when the UI is idle
+  (see UIDispatcher.call_when_idle), by slices, and their canvases kept so that scrolling finds them in
+  the canvas cache. A change of the list box stops the prefetch, the next render starts another one.
+  The canvas of the last render is kept, with the canvases of its rows, so that a focus move, which
+  only changes the rows of the old and the new focus, renders these two rows again and combines the
+  others from the canvas cache, even when the screen does not keep the canvas it drew.
+  jump_to and set_scroll_state move to any position without the layout of the rows around the old focus
+  that set_focus does, which only needs the rows shown with a list walker like IndexedListWalker.
+  """
+  _default_sensitive_attr = 'body'
+  _default_unsensitive_attr = 'body'
+  _selectable = True
+  _handles_repeat = True
+  coalesce_focus_events = True
+  """ the moves of a repeated key (see urwidm.keyrepeat) only send focus events to the widget left and the widget reached """
+  _repeating = False  # moving silently for a repeated key
+  prefetch_rows = 0
+  """ rows to render ahead above and below the view, 0 to disable """
+  prefetch_limit = 40000
+  """ screen cells (rows by columns) of the canvases rendered ahead and kept, at most """
+  _prefetch = None  # running prefetch, a generator
+  _prefetch_view = None  # size, focus and position of the view of the last prefetch started
+  _prefetched = ()  # canvases rendered ahead by the last complete prefetch
+  _rendered = None  # canvas of the last render, keeping the canvases of its rows in the canvas cache
+
+  def __init__(self, body):
+    More.__init__(self)
+    ListBox.__init__(self, body)
+
+  def change_focus(self, size, position, offset_inset=0, coming_from=None, cursor_coords=None, snap_rows=None):
+    if self._repeating:
+      ListBox.change_focus(self, size, position, offset_inset, coming_from, cursor_coords, snap_rows)
+      return True
+    return self._change_focus(self._widget_at(position), lambda: ListBox.change_focus(self, size, position, offset_inset, coming_from, cursor_coords, snap_rows))
+
+  def _widget_at(self, position):
+    if isinstance(self.body, list):
+      return self.body[position]
+    # hack for found the current widget in the list walker.
+    return self.body.get_next(position - 1)[0]
+
+  def _change_focus(self, new_widget, apply):
+    old_widget, old_focus_pos = self.body.get_focus()
+    ok = True
+    with FocusTransition(self, lambda: ListBox.set_focus(self, old_focus_pos)) as transition:
+      if isinstance(old_widget, FocusEventWidget):
+        ok = old_widget.loose_focus()
+      if ok and isinstance(new_widget, FocusEventWidget):
+        ok = new_widget.gain_focus()
+    if ok:
+      apply()
+      transition.commit()
+    else:
+      transition.cancel()
+    return ok
+
+  def keypress(self, size, key):
+    if repeat_count(key) > 1:
+      return self._keypress_repeated(size, key)
+    return self.__super.keypress(size, key)
+
+  def _keypress_repeated(self, size, key):
+    """
+    Handle the presses of a RepeatedKey. The moves of the ListBox depend on the rows in view, so each
+    press is still handled on its own, the widget in focus getting it first, but the moves are silent.
+    """
+    count = key.presses
+    key = unicode(key)
+    start_widget, start_pos = self.body.get_focus()
+    key_left = None
+    self._repeating = self.coalesce_focus_events
+    try:
+      while count:
+        key_left = self.__super.keypress(size, key)
+        if key_left is not None:
+          key_left = repeated(key_left, count)
+          break
+        count -= 1
+    finally:
+      self._repeating = False
+    end_widget, end_pos = self.body.get_focus()
+    if self.coalesce_focus_events and end_widget is not start_widget:
+      # back to the widget left, to move from it to the widget reached with the focus events
+      state = self.get_scroll_state()
+      ListBox.set_focus(self, start_pos)
+      self._change_focus(end_widget, lambda: self._set_view(state))
+    return key_left
+
+  def jump_to(self, position, valign='middle', events=True):
+    """
+    Move the focus to position, shown at valign (see set_focus_valign), at once: only the rows shown
+    there are laid out, by the next render.
+    Return False if the focus change has been denied.
+    """
+    return self._move_to(self._widget_at(position), events, lambda: self._jump(position, valign))
+
+  def jump_to_key(self, key, valign='middle', events=True):
+    """ Move the focus to the row of key, see jump_to, with a list walker having position_of, like IndexedListWalker. """
+    return self.jump_to(self.body.position_of(key), valign, events)
+
+  def get_scroll_state(self):
+    """ Return the ScrollState of the last render. """
+    return ScrollState(self.body.get_focus()[1], self.offset_rows, self.inset_fraction, self.pref_col)
+
+  def set_scroll_state(self, state, events=True):
+    """
+    Restore a ScrollState as it was, at once, see jump_to.
+    Return False if the focus change has been denied.
+    """
+    return self._move_to(self._widget_at(state.position), events, lambda: self._set_view(state))
+
+  def _move_to(self, widget, events, apply):
+    if events and widget is not self.get_focused_subwidget():
+      return self._change_focus(widget, apply)
+    apply()
+    return True
+
+  def _jump(self, position, valign):
+    self.body.set_focus(position)
+    self.set_focus_pending = None
+    self.set_focus_valign(valign)
+    self._invalidate()
+
+  def _set_view(self, state):
+    self.body.set_focus(state.position)
+    self.offset_rows, self.inset_fraction, self.pref_col = state.offset_rows, state.inset_fraction, state.pref_col
+    self.set_focus_pending = self.set_focus_valign_pending = None
+    self._invalidate()
+
+  def get_focused_subwidget(self):
+    return self.get_focus()[0]
+
+  def set_focused_subwidget(self, widget, events=True):
+    """ Only for a list walker that is a list, see get_subwidgets. """
+    position = self.body.index(widget)
+    if not events:
+      ListBox.set_focus(self, position)
+    elif widget is not self.get_focused_subwidget():
+      self._change_focus(widget, lambda: ListBox.set_focus(self, position))
+    return widget is self.get_focused_subwidget()
+
+  def get_subwidgets(self):
+    """ Only the widgets of a list walker that is a list, like SimpleListWalker, are known. """
+    if isinstance(self.body, list):
+      return list(self.body)
+    return []
+
+  def mouse_event(self, size, event, button, col, row, focus):
+    """
+    Pass the event to the contained widgets.
+    May change focus on button 1 press.
+    """
+    (maxcol, maxrow) = size
+    middle, top, bottom = self.calculate_visible((maxcol, maxrow), focus=True)
+    if middle is None:
+      return False
+    _ignore, focus_widget, focus_pos, focus_rows, cursor = middle
+    trim_top, fill_above = top
+    _ignore, fill_below = bottom
+    fill_above.reverse()  # fill_above is in bottom-up order
+    w_list = (fill_above + [(focus_widget, focus_pos, focus_rows)] + fill_below)
+    wrow = -trim_top
+    for w, w_pos, w_rows in w_list:
+      if wrow + w_rows > row:
+        break
+      wrow += w_rows
+    else:
+      return False
+    focus = focus and w == focus_widget
+    if urwid_is_mouse_press(event) and button == 1 and w.selectable():
+      if not self.change_focus((maxcol, maxrow), w_pos, wrow):
+        return False
+    if hasattr(w, 'mouse_event'):
+      return w.mouse_event((maxcol,), event, button, col, row - wrow, focus)
+    else:
+      return False
+
+  def render(self, size, focus=False):
+    # hack to trigger a focus_gain on the first selectable widget, when the list walker can be iterated
+    if self.set_focus_pending == 'first selectable' and hasattr(self.body, '__iter__'):
+      for i, w in enumerate(self.body):
+        if w.selectable():
+          self.change_focus(size, i)
+          break
+    self._rendered = self.__super.render(size, focus)
+    # render with attribute wrapping
+    canvas = self.canvas_with_attr(self._rendered, focus)
+    # the same view rendered again, like when the screen did not keep its canvas, is not prefetched again
+    view = (size, focus, self.get_focus()[1], self.offset_rows)
+    if self.prefetch_rows and view != self._prefetch_view:
+      self._prefetch_view = view
+      self._prefetch = self._prefetch_rows(size, focus)
+      UIDispatcher.call_when_idle(self._prefetch_slice, self._prefetch)
+    return canvas
+
+  def _invalidate(self):
+    self._prefetch = None
+    self._prefetch_view = None
+    self.__super._invalidate()
+
+  def _prefetch_slice(self, prefetch):
+    """ Idle task: render rows ahead for UIDispatcher.idle_slice seconds, return True if there are rows left. """
+    if prefetch is not self._prefetch:
+      return False  # the list box changed
+    deadline = time.time() + UIDispatcher.idle_slice
+    for rendered in prefetch:
+      if time.time() >= deadline:
+        return True
+    return False
+
+  def _prefetch_rows(self, size, focus):
+    """ Render the rows next to the view, alternately below and above, yielding after each one. """
+    maxcol = size[0]
+    middle, top, bottom = self.calculate_visible(size, focus)
+    if middle is None:
+      return
+    fill_above, fill_below = top[1], bottom[1]
+    # [get the next row, last position, rows rendered] on each side, fill_above being in bottom-up order
+    sides = [
+      [self.body.get_next, fill_below[-1][1] if fill_below else middle[2], 0],
+      [self.body.get_prev, fill_above[-1][1] if fill_above else middle[2], 0],
+    ]
+    kept = []
+    cells = 0
+    while sides and cells < self.prefetch_limit:
+      for side in list(sides):
+        get, pos, rows = side
+        w, pos = get(pos)
+        if w is None or rows >= self.prefetch_rows:
+          sides.remove(side)
+          continue
+        canvas = w.render((maxcol,), focus=False)
+        kept.append(canvas)
+        side[1:] = pos, rows + canvas.rows()
+        cells += canvas.rows() * maxcol
+        yield canvas
+    self._prefetched = kept
+
+
+class IndexedListWalker(ListWalker):
+  """
+  List walker of a sequence of items, up to millions, whose row widgets are made by make_row(item) only
+  when the ListBox asks for them. Positions are the indexes of the items, so any row is found at once.
+  With key, a function returning the key of an item (the item itself by default), position_of finds the
+  row of a key, through a dict built on its first call.
+  A row widget may be made again once out of the cache, so the state of the rows belongs in the items.
+  """
+  cache_size = 256
+  """ row widgets kept, so that the rows in view keep their cached canvas """
+
+  def __init__(self, items, make_row=Text, key=None):
+    self.make_row = make_row
+    self.key = key
+    self.focus = 0
+    self.set_items(items)
+
+  def set_items(self, items):
+    """ Show items, after a change of the sequence for instance. """
+    self.items = items
+    self._widgets = {}
+    self._positions = None
+    self.focus = max(0, min(self.focus, len(items) - 1))
+    self._modified()
+
+  def __len__(self):
+    return len(self.items)
+
+  def position_of(self, key):
+    """ Return the position of the item of key, raise KeyError if there is none. """
+    if self._positions is None:
+      get_key = self.key or (lambda item: item)
+      self._positions = dict((get_key(item), pos) for pos, item in enumerate(self.items))
+    return self._positions[key]
+
+  def _get_widget(self, pos):
+    if pos < 0 or pos >= len(self.items):
+      return None, None
+    w = self._widgets.get(pos)
+    if w is None:
+      if len(self._widgets) >= self.cache_size:
+        self._widgets.clear()
+      w = self._widgets[pos] = self.make_row(self.items[pos])
+    return w, pos
+
+  def get_focus(self):
+    return self._get_widget(self.focus)
+
+  def set_focus(self, focus):
+    self.focus = focus
+    self._modified()
+
+  def get_next(self, start_from):
+    return self._get_widget(start_from + 1)
+
+  def get_prev(self, start_from):
+    return self._get_widget(start_from - 1)
+
+
+class TailListWalker(ListWalker):
+  """
+  Append-only list walker keeping the last capacity rows, in a ring buffer, for log views.
+  append and extend may be called from any thread: the rows are added by flush, run on the UI
+  thread through UIDispatcher, so the rows appended between two frames are added at once.
+  A row is a widget, or a markup turned into a Text when it is displayed.
+  Positions keep counting the dropped rows, so they stay valid.
+  The focus follows the last row, unless it was moved to another row, like when scrolling up.
+  """
+  def __init__(self, capacity=10000):
+    self.capacity = capacity
+    self._ring = []
+    self._start = 0  # index in _ring of the oldest row
+    self.first = 0
+    """ position of the oldest row kept """
+    self.focus = 0
+    self.follow = True
+    self._pending = deque()
+    self._flush_scheduled = False
+
+  def __len__(self):
+    return len(self._ring)
+
+  def append(self, row):
+    self._pending.append(row)
+    self._schedule_flush()
+
+  def extend(self, rows):
+    self._pending.extend(rows)
+    self._schedule_flush()
+
+  def _schedule_flush(self):
+    if not self._flush_scheduled:
+      self._flush_scheduled = True
+      UIDispatcher.call_soon(self.flush)
+
+  def flush(self):
+    """ Add the pending rows, dropping the oldest ones beyond capacity. """
+    self._flush_scheduled = False
+    pending = self._pending
+    count = len(pending)
+    if not count:
+      return
+    for i in range(count):
+      row = pending.popleft()
+      if len(self._ring) < self.capacity:
+        self._ring.append(row)
+      else:
+        self._ring[self._start] = row
+        self._start = (self._start + 1) % self.capacity
+        self.first += 1
+    if self.follow or self.focus < self.first:
+      self.focus = self.first + len(self._ring) - 1
+    self._modified()
+
+  def _get_widget(self, pos):
+    i = pos - self.first
+    if i < 0 or i >= len(self._ring):
+      return None, None
+    i = (self._start + i) % self.capacity
+    w = self._ring[i]
+    if not isinstance(w, Widget):
+      w = self._ring[i] = Text(w)
+    return w, pos
+
+  def get_focus(self):
+    return self._get_widget(self.focus)
+
+  def set_focus(self, focus):
+    self.focus = focus
+    self.follow = focus >= self.first + len(self._ring) - 1
+    self._modified()
+
+  def get_next(self, start_from):
+    return self._get_widget(start_from + 1)
+
+  def get_prev(self, start_from):
+    return self._get_widget(start_from - 1)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# coding: utf-8
+# vim:et:sta:sts=2:sw=2:ts=2:tw=0:
+"""
+Memory-mapped text: a list walker showing a file, or a buffer, line by line, without reading it all.
+"""
+from __future__ import unicode_literals
+
+import mmap
+import threading
+from array import array
+from urwid import ListWalker, Text
+from urwidm.futures import UIDispatcher
+
+
+class MappedTextWalker(ListWalker):
+  """
+  List walker of the lines of a file, given by its path, or of a buffer like an mmap or a bytearray.
+  A file is memory-mapped. The offsets of the lines are indexed by chunks of chunk_size bytes:
+  the first one at once, the others in a thread, each one announced on the UI thread through UIDispatcher.
+  The Text widgets are only created for the lines asked by the ListBox, so only the lines
+  in view are decoded and laid out.
+  """
+  chunk_size = 4 << 20
+  cache_size = 256
+  """ Text widgets kept, so that the lines in view keep their cached canvas """
+
+  def __init__(self, source, encoding='utf8'):
+    self.encoding = encoding
+    self._map = None
+    if isinstance(source, basestring):
+      with open(source, 'rb') as f:
+        try:
+          self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+          self._map = b''
+      self._data = self._map
+    else:
+      self._data = source
+    self._size = len(self._data)
+    self._starts = array(b'L', [0])  # offset of the start of each line found so far
+    self.complete = False
+    self.focus = 0
+    self._widgets = {}
+    self._lock = threading.Lock()
+    self._closed = False
+    # the first chunk is indexed at once, to show the first lines in the first frame
+    pos = self._index_chunk(0)
+    if not self.complete:
+      self._thread = threading.Thread(target=self._index, args=(pos,))
+      self._thread.daemon = True
+      self._thread.start()
+
+  def _index_chunk(self, pos):
+    """ Index the lines of the chunk starting at the offset pos, return the offset of the next one. """
+    with self._lock:
+      if self._closed:
+        return self._size
+      end = min(pos + self.chunk_size, self._size)
+      starts = []
+      find = self._data.find
+      p = find(b'\n', pos, end)
+      while p != -1:
+        starts.append(p + 1)
+        p = find(b'\n', p + 1, end)
+      self._starts.extend(starts)
+      self.complete = end >= self._size
+    return end
+
+  def _index(self, pos):
+    while not self.complete and not self._closed:
+      pos = self._index_chunk(pos)
+      UIDispatcher.call_soon(self._modified)
+
+  def close(self):
+    """ Stop indexing and unmap the file. """
+    with self._lock:
+      self._closed = True
+      if isinstance(self._map, mmap.mmap):
+        self._map.close()
+
+  def line_count(self):
+    """ Return the number of lines known so far, all of them once complete. """
+    count = len(self._starts) - 1
+    if self.complete and self._starts[-1] < self._size or self._size == 0:
+      count += 1  # last line, without newline
+    return count
+
+  def get_line(self, pos):
+    """ Return the line pos, decoded, without its newline. """
+    start = self._starts[pos]
+    if pos + 1 < len(self._starts):
+      end = self._starts[pos + 1] - 1
+    else:
+      end = self._size
+    line = self._data[start:end]
+    return line.decode(self.encoding, 'replace').rstrip('\r').expandtabs()
+
+  def _get_widget(self, pos):
+    if pos < 0 or pos >= self.line_count():
+      return None, None
+    w = self._widgets.get(pos)
+    if w is None:
+      if len(self._widgets) >= self.cache_size:
+        self._widgets.clear()
+      w = self._widgets[pos] = Text(self.get_line(pos))
+    return w, pos
+
+  def get_focus(self):
+    return self._get_widget(self.focus)
+
+  def set_focus(self, focus):
+    self.focus = focus
+    self._modified()
+
+  def get_next(self, start_from):
+    return self._get_widget(start_from + 1)
+
+  def get_prev(self, start_from):
+    return self._get_widget(start_from - 1)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# coding: utf-8
+# vim:et:sta:sts=2:sw=2:ts=2:tw=0:
+"""
+Mouse routing: the mouse events sent straight to the widget under the pointer, found in the last rendered canvas.
+"""
+from __future__ import unicode_literals
+
+from bisect import bisect_right
+from urwid import CanvasCache, CompositeCanvas
+from urwid.util import is_mouse_press as urwid_is_mouse_press
+from urwidm.damage import positioned_cviews
+from urwidm.widget import MOUSE_TARGET, WidgetWrapMore
+
+
+class MouseIndex(object):
+  """
+  The parts of a canvas where a widget handling the mouse events itself (see _handles_mouse) is visible, by row.
+  These widgets leave their canvas in the coords of the canvas, which urwid moves along when it is
+  combined, padded or trimmed. A part of their canvas covered by an overlay is not theirs: only the
+  canvases the screen is made of that come from their canvas, at the same place, are kept.
+  """
+  def __init__(self, canvas):
+    # (canvas, column, row of its origin on the screen) -> visible rectangles
+    visible = {}
+    for (col, row), cv in positioned_cviews(canvas).items():
+      visible.setdefault((id(cv[5]), col - cv[0], row - cv[1]), []).append((col, row, col + cv[2], row + cv[3]))
+    rows = {}
+    for name, (x, y, ref) in canvas.coords.items():
+      if not isinstance(name, tuple) or name[0] != MOUSE_TARGET:
+        continue
+      target = ref()
+      if target is None or target.widget_info is None:
+        continue
+      widget, size, focus = target.widget_info
+      for (col, row), cv in positioned_cviews(target).items():
+        left, top, right, bottom = x + col, y + row, x + col + cv[2], y + row + cv[3]
+        for vleft, vtop, vright, vbottom in visible.get((id(cv[5]), left - cv[0], top - cv[1]), ()):
+          span = (max(left, vleft), min(right, vright), (widget, size, focus, x, y))
+          for r in range(max(top, vtop), min(bottom, vbottom)):
+            rows.setdefault(r, []).append(span)
+    self._rows = {}  # row -> (start columns, [(start, end, target)]), sorted
+    for row, parts in rows.items():
+      parts.sort(key=lambda part: part[0])
+      self._rows[row] = ([part[0] for part in parts], parts)
+
+  def find(self, col, row):
+    """ Return (widget, size, focus, col, row) of the widget under (col, row), or None. """
+    try:
+      starts, parts = self._rows[row]
+    except KeyError:
+      return None
+    i = bisect_right(starts, col) - 1
+    if i < 0 or col >= parts[i][1]:
+      return None
+    widget, size, focus, x, y = parts[i][2]
+    return widget, size, focus, col - x, row - y
+
+
+class MouseRouter(WidgetWrapMore):
+  """
+  Wrap the topmost widget to send the mouse events to the widget under the pointer without going
+  through the layout of every container, as long as nothing was invalidated since the last render.
+  Presses go through the containers, which may move the focus; drags and releases, which are most of
+  the events with mouse tracking, go straight to the widget found in the MouseIndex of the last canvas.
+  Elsewhere, like over widgets that are not More widgets, they also go through the containers.
+  """
+  _index = None
+  _canvas = None
+
+  def render(self, size, focus=False):
+    return CompositeCanvas(self._w.render(size, focus=focus))
+
+  def get_index(self, size, focus=False):
+    """ Return the MouseIndex of the last render, or None if the widgets changed since then. """
+    canvas = CanvasCache.fetch(self, MouseRouter, size, focus)
+    if canvas is None:
+      return None
+    if canvas is not self._canvas:
+      self._index = MouseIndex(canvas)
+      self._canvas = canvas
+    return self._index
+
+  def mouse_event(self, size, event, button, col, row, focus):
+    if not urwid_is_mouse_press(event):
+      index = self.get_index(size, focus)
+      found = index and index.find(col, row)
+      if found:
+        widget, wsize, wfocus, wcol, wrow = found
+        return widget.mouse_event(wsize, event, button, wcol, wrow, wfocus)
+    if not hasattr(self._w, 'mouse_event'):
+      return False
+    return self._w.mouse_event(size, event, button, col, row, focus)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# coding: utf-8
+# vim:et:sta:sts=2:sw=2:ts=2:tw=0:
+"""
+Record the input fed to a urwidm tree and replay it without a terminal,
+measuring the latency of each event.
+"""
+from __future__ import unicode_literals
+
+import json
+import time
+from collections import deque
+from urwid import ExitMainLoop
+from urwidm.fake_display import Screen
+
+
+def percentile(values, pct):
+  """
+  Return the nearest-rank percentile pct (0-100) of values, or None if values is empty.
+  """
+  if not values:
+    return None
+  values = sorted(values)
+  rank = int(round(pct / 100.0 * (len(values) - 1)))
+  return values[rank]
+
+
+class InputRecorder(object):
+  """
+  Record the keys and mouse events fed to a urwidm tree, with their timestamps.
+  The events read at once share their timestamp, which is different from the one of the events read before.
+  Use input_filter as the input_filter of a MainLoop, or give wrap_screen(ui) to Dialog2.run.
+  """
+  def __init__(self):
+    self.events = []  # list of (seconds since first event, event)
+    self._start = None
+
+  def record(self, keys):
+    now = time.time()
+    if self._start is None:
+      self._start = now
+    timestamp = now - self._start
+    if self.events and timestamp <= self.events[-1][0]:
+      timestamp = self.events[-1][0] + 1e-6
+    for k in keys:
+      self.events.append((timestamp, k))
+
+  def input_filter(self, keys, raw):
+    self.record(keys)
+    return keys
+
+  def wrap_screen(self, screen):
+    return RecordingScreen(screen, self)
+
+  def save(self, path):
+    with open(path, 'w') as f:
+      json.dump(self.events, f)
+
+  @staticmethod
+  def load(path):
+    """ Return the list of (timestamp, event) saved in path. """
+    with open(path) as f:
+      events = json.load(f)
+    # mouse events are tuples, json gives them back as lists
+    return [(t, tuple(k) if isinstance(k, list) else k) for t, k in events]
+
+
+class RecordingScreen(object):
+  """ Proxy of a screen that records everything returned by get_input. """
+  def __init__(self, screen, recorder):
+    self._screen = screen
+    self._recorder = recorder
+
+  def __getattr__(self, name):
+    return getattr(self._screen, name)
+
+  def get_input(self, raw_keys=False):
+    ret = self._screen.get_input(raw_keys)
+    if raw_keys:
+      self._recorder.record(ret[0])
+    else:
+      self._recorder.record(ret)
+    return ret
+
+  def get_input_nonblocking(self):
+    ret = self._screen.get_input_nonblocking()
+    self._recorder.record(ret[1])
+    return ret
+
+
+class ReplayScreen(Screen):
+  """
+  In-memory screen feeding recorded events by batches, the events with the same timestamp being read at once.
+  ExitMainLoop is raised when there is no more event to feed.
+  """
+  def __init__(self, events, size=(80, 24), realtime=False):
+    """
+    events  : list of (timestamp, event), as recorded by InputRecorder
+    size    : (cols, rows) of the screen
+    realtime: wait for the recorded delay between two events
+    """
+    Screen.__init__(self, size)
+    self.realtime = realtime
+    self._timestamps = deque()
+    self._replay_start = None
+    self.events_fed = 0
+    batches = []
+    for timestamp, event in events:
+      if batches and timestamp == self._timestamps[-1]:
+        batches[-1].append(event)
+      else:
+        self._timestamps.append(timestamp)
+        batches.append([event])
+    self.script_input(*batches)
+
+  def _next_input(self):
+    keys = Screen._next_input(self)
+    timestamp = self._timestamps.popleft()
+    self.events_fed += len(keys)
+    if self.realtime:
+      if self._replay_start is None:
+        self._replay_start = time.time() - timestamp
+      delay = self._replay_start + timestamp - time.time()
+      if delay > 0:
+        time.sleep(delay)
+    return keys
+
+
+class InputReplayer(object):
+  """
+  Replay recorded events headlessly into a MainLoop or a Dialog2 and report the latencies.
+  """
+  def __init__(self, events, size=(80, 24), realtime=False):
+    self.screen = ReplayScreen(events, size, realtime)
+    self.render_time = 0.0
+
+  def _time_render(self, widget):
+    """ Add the time spent rendering widget to render_time, until _untime_render(widget). """
+    render = widget.render
+
+    def timed_render(size, focus=False):
+      start = time.time()
+      try:
+        return render(size, focus)
+      finally:
+        self.render_time += time.time() - start
+    widget.render = timed_render
+
+  def _untime_render(self, widget):
+    del widget.render
+
+  def run_loop(self, loop):
+    """ Replace the screen of the MainLoop loop and feed it all the events. """
+    loop.screen = self.screen
+    loop.screen_size = None
+    # with pop ups, the rendered widget is the PopUpTarget wrapping loop.widget
+    top = loop._topmost_widget
+    self._time_render(top)
+    try:
+      loop.run()
+    finally:
+      self._untime_render(top)
+    return self.report()
+
+  def run_dialog(self, dialog, parent):
+    """
+    Run the Dialog2 dialog over parent, feeding it all the events.
+    Return (exit value of the dialog or None if the events ran out first, report).
+    """
+    ret = None
+    # the dialog renders an overlay of its content over parent, which is not reachable: time both
+    widgets = [parent, dialog._w]
+    for w in widgets:
+      self._time_render(w)
+    try:
+      ret = dialog.run(self.screen, parent)
+    except ExitMainLoop:
+      pass
+    finally:
+      for w in widgets:
+        self._untime_render(w)
+    return ret, self.report()
+
+  def report(self):
+    """
+    Return a dict with the number of events and of input batches fed, the latency percentiles (input to frame
+    drawn, in seconds), the total frame time, the time spent rendering the widgets into canvases and drawing
+    the canvases on the screen, and the number of (redundant) frames.
+    """
+    latencies = self.screen.keystroke_times
+    return {
+      'events': self.screen.events_fed,
+      'batches': len(latencies),
+      'p50': percentile(latencies, 50),
+      'p90': percentile(latencies, 90),
+      'p99': percentile(latencies, 99),
+      'max': max(latencies) if latencies else None,
+      'frame_time': sum(latencies),
+      'render_time': self.render_time,
+      'draw_time': self.screen.draw_time,
+      'frames': self.screen.frame_count,
+      'redundant_frames': self.screen.redundant_frames,
+    }
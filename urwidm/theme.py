@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# coding: utf-8
+# vim:et:sta:sts=2:sw=2:ts=2:tw=0:
+"""
+Theme registry: switch the colors of a whole UI without touching its widgets.
+"""
+from __future__ import unicode_literals
+
+from urwid import CanvasCache
+
+
+class ThemeRegistry(object):
+  """
+  The More widgets use logical attribute roles, like 'focusable', 'focus_edit' or 'comboitem'.
+  A theme is a palette (see MainLoop) for these roles, and optionally a mapping of some roles
+  to other attributes, applied when the More widgets render.
+  Like CanvasCache, everything is stored on the class.
+  Switching to a theme registers its palette on the screen and asks for one full redraw.
+  When the role mapping changes, generation is incremented and the canvas cache is cleared,
+  the AttrPair resolve their maps again on their next render.
+  """
+  themes = {}
+  current = None
+  roles = {}
+  """ role -> attribute of the current theme """
+  generation = 0
+
+  @classmethod
+  def register(cls, name, palette, roles=None):
+    """
+    palette: list of palette entries, see BaseScreen.register_palette
+    roles  : dict of role -> attribute to use instead
+    """
+    cls.themes[name] = (palette, dict(roles or {}))
+
+  @classmethod
+  def resolve(cls, attr):
+    """ Return the attribute to use for the role attr. """
+    try:
+      return cls.roles.get(attr, attr)
+    except TypeError:  # unhashable, not a role
+      return attr
+
+  @classmethod
+  def use(cls, name, screen=None):
+    """ Switch to the theme name, redrawing screen if given. """
+    palette, roles = cls.themes[name]
+    cls.current = name
+    if roles != cls.roles:
+      cls.roles = roles
+      cls.generation += 1
+      CanvasCache.clear()
+    if screen is not None:
+      screen.register_palette(palette)
+      screen.clear()
@@ -0,0 +1,1246 @@
+#!/usr/bin/env python
+# coding: utf-8
+# vim:et:sta:sts=2:sw=2:ts=2:tw=0:
+"""
+Base behaviors of the More widgets, and the More versions of the basic urwid widgets.
+"""
+from __future__ import unicode_literals
+
+from urwid import Widget, Text, Edit, IntEdit, WidgetWrap, TextError, Canvas, TextCanvas, CompositeCanvas, CanvasCache, LEFT, SPACE, default_layout, calc_width, move_prev_char, move_next_char
+from urwid import util as urwid_util
+from urwid.signals import _signals as urwid_signals
+from urwid.canvas import apply_text_layout as urwid_apply_text_layout
+from urwid.text_layout import calc_coords, calc_pos, shift_line
+from urwidm.futures import UIDispatcher, future_answer, is_future
+from urwidm.linebuffer import LineBuffer
+from urwidm.theme import ThemeRegistry
+from heapq import heapify, heappop, heappush
+from weakref import WeakKeyDictionary, WeakSet, ref as weakref
+
+MOUSE_TARGET = 'mouse target'
+""" first item of the coords names a widget handling the mouse events leaves in its canvas, see MouseIndex """
+
+
+def drop_mouse_targets(canvas, keep=()):
+  """ Remove the widgets handling the mouse events from the coords of canvas, except the ones named in keep. """
+  for name in [name for name in canvas.coords if isinstance(name, tuple) and name[0] == MOUSE_TARGET and name not in keep]:
+    del canvas.coords[name]
+
+
+class FocusTransition(object):
+  """
+  A focus change in a container.
+  Focus handlers may answer with a future (see urwidm.futures.in_thread): while the transition
+  is the current one, these answers are collected instead of waited for. The change is then
+  applied provisionally, and undone if one of them answers False, raises or times out.
+  A transition superseded by a newer focus change in the same container discards its answers.
+  The undo emits a focuslost event to the widgets that got the focus and a focusgain event to the ones
+  getting it back, whose answers are not waited for: the undo cannot be refused.
+  """
+  timeout = 5.0
+  current = None
+  _latest = WeakKeyDictionary()  # container -> transition waiting for answers
+
+  def __init__(self, container, restore):
+    """
+    container: the widget whose focus changes
+    restore  : callable giving back the previous focus to the container
+    """
+    self.container = container
+    self.restore = restore
+    self.futures = []
+    self.focus_flags = []  # (widget, previous _has_focus, new _has_focus)
+    self.closed = False
+
+  def __enter__(self):
+    self._outer = FocusTransition.current
+    FocusTransition.current = self
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    FocusTransition.current = self._outer
+
+  def commit(self):
+    """ Call once the change is applied: watch the pending answers, if any. """
+    if not self.futures:
+      self.closed = True
+      FocusTransition._latest.pop(self.container, None)
+      return
+    FocusTransition._latest[self.container] = self
+    for future in self.futures:
+      future.add_done_callback(lambda future: UIDispatcher.call_soon(self._answered, future))
+    UIDispatcher.call_later(self.timeout, self._timed_out)
+
+  def cancel(self):
+    """ Call instead of commit when the change was refused: the answers still pending are cancelled. """
+    self._close()
+
+  def _stale(self):
+    if not self.closed and FocusTransition._latest.get(self.container) is not self:
+      self._close()
+    return self.closed
+
+  def _close(self):
+    self.closed = True
+    if FocusTransition._latest.get(self.container) is self:
+      del FocusTransition._latest[self.container]
+    for future in self.futures:
+      if not future.done():
+        future.cancel()
+
+  def _answered(self, future):
+    if self._stale() or future.cancelled():
+      return
+    if not future_answer(future, 0):
+      self.veto()
+    elif all(f.done() for f in self.futures):
+      self._close()
+
+  def _timed_out(self):
+    if not self._stale():
+      self.veto()
+
+  def veto(self):
+    """ Undo the focus change. """
+    self._close()
+    # the answers of the handlers are collected by a transition never committed, so not waited for
+    with FocusTransition(self.container, self.restore):
+      for widget, has_focus, gained in reversed(self.focus_flags):
+        if gained:
+          widget._emit_focuslost_rec()
+      for widget, has_focus, gained in reversed(self.focus_flags):
+        widget._set_has_focus(has_focus, record=False)
+      self.restore()
+      for widget, has_focus, gained in self.focus_flags:
+        if not gained:
+          widget._emit_focusgain_rec()
+    self.container._invalidate()
+
+
+class FocusEventWidget(Widget):
+  signals = ['focusgain', 'focuslost']  # will be used by the metaclass of Widget to call register_signal
+  _has_focus = False
+
+  @property
+  def has_focus(self):
+    return self._has_focus
+
+  def _can_gain_focus(self):
+    return True
+
+  def _can_loose_focus(self):
+    return True
+
+  def get_focused_subwidget(self):
+    return None
+
+  def get_subwidgets(self):
+    """ Return the widgets directly contained in this widget. """
+    return []
+
+  def get_focusable_subwidgets(self):
+    """ Return the widgets contained in this widget that may get the focus, see FocusRing. """
+    return self.get_subwidgets()
+
+  def set_focused_subwidget(self, widget, events=True):
+    """
+    Give the focus to widget, one of the widgets directly contained, emitting the focus events unless events is False.
+    Return True if widget has the focus, False if the change was refused.
+    """
+    return widget is self.get_focused_subwidget()
+
+  def _can_gain_focus_rec(self):
+    ret = self._can_gain_focus()
+    subw = self.get_focused_subwidget()
+    if subw and isinstance(subw, FocusEventWidget):
+      ret &= subw._can_gain_focus_rec()
+    return ret
+
+  def _can_loose_focus_rec(self):
+    ret = self._can_loose_focus()
+    subw = self.get_focused_subwidget()
+    if subw and isinstance(subw, FocusEventWidget):
+      ret &= subw._can_loose_focus_rec()
+    return ret
+
+  def _set_has_focus(self, has_focus, record=True):
+    """ record: let the current FocusTransition know, to undo it """
+    transition = FocusTransition.current
+    if record and transition is not None:
+      transition.focus_flags.append((self, self._has_focus, has_focus))
+    if has_focus:
+      self._has_focus = True
+    else:
+      self.__dict__.pop('_has_focus', None)  # back to the class default
+
+  def _emit_focus_event(self, name, *args):
+    """
+    Return True if there is no callback, or if all callback answer True.
+    A callback may answer with a future: during a FocusTransition it is left to the transition,
+    otherwise it is waited for.
+    """
+    result = True
+    signal_obj = urwid_signals
+    d = getattr(self, signal_obj._signal_attr, {})
+    for callback, user_arg in d.get(name, []):
+      args_copy = [self]
+      args_copy.extend(args)
+      if user_arg is not None:
+        args_copy.append(user_arg)
+      answer = callback(*args_copy)
+      if is_future(answer):
+        if FocusTransition.current is not None:
+          FocusTransition.current.futures.append(answer)
+          continue
+        answer = future_answer(answer, FocusTransition.timeout)
+      result &= bool(answer)
+    return result
+
+  def _emit_focusgain(self):
+    """
+    Return True if there is no callback, or if all callback answer True
+    """
+    return self._emit_focus_event('focusgain')
+
+  def _emit_focuslost(self):
+    """
+    Return True if there is no callback, or if all callback answer True
+    """
+    return self._emit_focus_event('focuslost')
+
+  def _emit_focusgain_rec(self):
+    ret = self._emit_focusgain()
+    subw = self.get_focused_subwidget()
+    if subw and isinstance(subw, FocusEventWidget):
+      ret &= subw._emit_focusgain_rec()
+    return ret
+
+  def _emit_focuslost_rec(self):
+    ret = True
+    subw = self.get_focused_subwidget()
+    if subw and isinstance(subw, FocusEventWidget):
+      ret = subw._emit_focuslost_rec()
+    ret &= self._emit_focuslost()
+    return ret
+
+  def gain_focus(self):
+    ret = self._can_gain_focus_rec()
+    if ret:
+      ret = self._emit_focusgain_rec()
+    if ret:
+      self._set_has_focus(True)
+    return ret
+
+  def loose_focus(self):
+    ret = self._can_loose_focus()
+    if ret:
+      ret = self._emit_focuslost_rec()
+    if ret:
+      self._set_has_focus(False)
+    return ret
+
+
+def get_subwidgets(widget):
+  """
+  Return the widgets directly contained in widget.
+  Containers that are not More widgets are recognized by their widget_list, cells,
+  original widget or wrapped widget.
+  """
+  if isinstance(widget, FocusEventWidget):
+    return widget.get_subwidgets()
+  for name in ('widget_list', 'cells'):
+    if hasattr(widget, name):
+      return list(getattr(widget, name))
+  for name in ('_original_widget', '_w'):
+    if isinstance(getattr(widget, name, None), Widget):
+      return [getattr(widget, name)]
+  return []
+
+
+def walk_subtree(widget):
+  """ Yield widget and all the widgets it contains, parents first. """
+  todo = [widget]
+  while todo:
+    w = todo.pop()
+    yield w
+    todo.extend(reversed([subw for subw in get_subwidgets(w) if subw is not None]))
+
+
+def _focused_subwidget(widget):
+  if isinstance(widget, FocusEventWidget):
+    return widget.get_focused_subwidget()
+  subwidgets = get_subwidgets(widget)
+  if len(subwidgets) == 1:
+    return subwidgets[0]
+  focus = getattr(widget, 'get_focus', lambda: None)()
+  return focus if isinstance(focus, Widget) else None
+
+
+def _set_focused_subwidget(widget, subwidget, events):
+  if isinstance(widget, FocusEventWidget):
+    return widget.set_focused_subwidget(subwidget, events)
+  if len(get_subwidgets(widget)) > 1:
+    widget.set_focus(subwidget)
+  return _focused_subwidget(widget) is subwidget
+
+
+class FocusRing(object):
+  """
+  The selectable and sensitive widgets of a tree, in document order, for Tab navigation.
+  The widgets contained in each widget of the tree and its selectable leaves are kept: when a More widget
+  is invalidated (content, sensitivity or focus change), only it and its ancestors are computed again,
+  and only the widgets it now contains that are not known yet are walked.
+  Moving the focus sets the focus of the ancestors of the new widget without event, except for the
+  deepest one that had the focus on another branch: it emits the focus events once, and may refuse.
+  Changes in widgets that are not More widgets are not seen, call invalidate for them.
+  """
+  keys = {'tab': 1, 'shift tab': -1}
+  _rings = WeakSet()
+
+  def __init__(self, root):
+    self.root = root
+    self._children = {}  # widget -> widgets it contains that may get the focus
+    self._parents = {}
+    self._leaves = {}  # widget -> its selectable leaves, in document order
+    self._insensitive = set()
+    self._dirty = set()
+    self._position = 0
+    self._update(root)
+    FocusRing._rings.add(self)
+
+  @classmethod
+  def invalidate(cls, widget):
+    """ Let the rings containing widget compute it again when they are next used. """
+    for ring in cls._rings:
+      if widget in ring._leaves:
+        ring._dirty.add(widget)
+
+  def _depth(self, widget):
+    depth = 0
+    while widget is not self.root:
+      widget = self._parents[widget]
+      depth += 1
+    return depth
+
+  def _refresh(self):
+    """ Compute the invalidated widgets again, deepest first, then their ancestors if their leaves changed. """
+    # a widget queued both as invalidated and as the parent of changed leaves is computed once, with changed_leaves
+    pending = [(-self._depth(w), id(w), True, w) for w in self._dirty if w in self._leaves]
+    self._dirty.clear()
+    heapify(pending)
+    done = set()
+    while pending:
+      depth, key, same_leaves, widget = heappop(pending)
+      if key in done or widget not in self._leaves:
+        continue
+      done.add(key)
+      if self._update(widget, not same_leaves) and widget is not self.root:
+        parent = self._parents[widget]
+        heappush(pending, (depth + 1, id(parent), False, parent))
+
+  def _update(self, widget, changed_leaves=True):
+    """
+    Compute the leaves of widget, walking the widgets it contains not known yet. Return True if they changed.
+    changed_leaves: False if only widget itself changed, its leaves are then kept when it contains the same widgets.
+    """
+    if isinstance(widget, FocusEventWidget):
+      children = tuple(widget.get_focusable_subwidgets())
+    else:
+      children = tuple(get_subwidgets(widget))
+    if None in children:
+      children = tuple(w for w in children if w is not None)
+    old_children = self._children.get(widget, ())
+    sensitive = getattr(widget, 'sensitive', True)
+    if not changed_leaves and children and children == old_children and sensitive == (widget not in self._insensitive):
+      return False
+    if sensitive:
+      self._insensitive.discard(widget)
+    else:
+      self._insensitive.add(widget)
+    if children != old_children:
+      kept = set(children)
+      for child in old_children:
+        if child not in kept and self._parents.get(child) is widget:
+          self._forget(child)
+      self._children[widget] = children
+    leaves = []
+    for child in children:
+      self._parents[child] = widget
+      if child not in self._leaves:
+        self._update(child)
+      leaves.extend(self._leaves[child])
+    if not sensitive:
+      leaves = []
+    elif not leaves and widget.selectable():
+      leaves = [widget]
+    changed = leaves != self._leaves.get(widget)
+    self._leaves[widget] = leaves
+    return changed
+
+  def _forget(self, widget):
+    todo = [widget]
+    while todo:
+      w = todo.pop()
+      self._leaves.pop(w, None)
+      self._parents.pop(w, None)
+      self._insensitive.discard(w)
+      todo.extend(self._children.pop(w, ()))
+
+  def get_leaves(self):
+    """ Return the selectable and sensitive widgets, in document order. """
+    if self._dirty:
+      self._refresh()
+    return self._leaves[self.root]
+
+  def get_focus(self):
+    """ Return the widget of the ring in focus, or None. """
+    self.get_leaves()
+    widget = self.root
+    while widget is not None:
+      leaves = self._leaves.get(widget)
+      if not leaves or leaves[0] is widget:
+        return widget
+      widget = _focused_subwidget(widget)
+    return None
+
+  def set_focus(self, widget):
+    """
+    Give the focus to widget, one of the leaves, setting the focus of its ancestors.
+    Return False if the change was refused.
+    """
+    leaves = self.get_leaves()
+    if not self._set_focus(widget):
+      return False
+    if self._position >= len(leaves) or leaves[self._position] is not widget:
+      self._position = leaves.index(widget)
+    return True
+
+  def _set_focus(self, widget):
+    path = [widget]
+    while path[-1] is not self.root:
+      path.append(self._parents[path[-1]])
+    path.reverse()
+    for i in range(len(path) - 1):
+      if _focused_subwidget(path[i]) is not path[i + 1]:
+        break
+    else:
+      return True
+    for j in range(len(path) - 2, i, -1):
+      _set_focused_subwidget(path[j], path[j + 1], False)
+    return _set_focused_subwidget(path[i], path[i + 1], True)
+
+  def move(self, offset):
+    """ Move the focus offset widgets forward, or backward if negative, wrapping around. Return True if it moved. """
+    leaves = self.get_leaves()
+    if not leaves:
+      return False
+    current = self.get_focus()
+    position = self._position
+    if position >= len(leaves) or leaves[position] is not current:
+      try:
+        position = leaves.index(current)
+      except ValueError:
+        position = -1 if offset > 0 else 0
+    position = (position + offset) % len(leaves)
+    if not self._set_focus(leaves[position]):
+      return False
+    self._position = position
+    return True
+
+  def keypress(self, key):
+    """ Move the focus on Tab and Shift-Tab, return the key if not handled. """
+    offset = self.keys.get(key)
+    if offset is None or not self.get_leaves():
+      return key
+    self.move(offset)
+
+
+class AttrPair(tuple):
+  """
+  An (attr, focus_attr) tuple with its attribute-mapping dicts precompiled.
+  Get them with intern_attr: widgets with the same attributes share the same AttrPair,
+  so rendering builds no dict and canvases compare their attribute maps by identity.
+  The attributes are roles resolved through the ThemeRegistry, the maps are compiled again
+  when its generation changes.
+  """
+  _max_combined = 64
+
+  def __new__(cls, attr, focus_attr):
+    self = tuple.__new__(cls, (attr, focus_attr))
+    self._generation = None
+    self._combined = {}  # (id(mapping), id(attr map of a canvas)) -> (that attr map, combined mapping)
+    self._compile()
+    return self
+
+  def _compile(self):
+    attr, focus_attr = self
+    self.normal_map = self._to_map(attr)
+    self.focus_map = self._to_map(focus_attr) if focus_attr else self.normal_map
+    self._combined.clear()
+    self._generation = ThemeRegistry.generation
+
+  @staticmethod
+  def _to_map(attr):
+    resolve = ThemeRegistry.resolve
+    if type(attr) == dict:
+      if not ThemeRegistry.roles:
+        return attr
+      return dict((resolve(k), resolve(v)) for k, v in attr.items())
+    return {None: resolve(attr)}
+
+  def _combine(self, mapping, attr_map):
+    """ Same as CompositeCanvas.fill_attr_apply for one attr_map, but combinations are reused. """
+    if attr_map is None:
+      return mapping
+    key = (id(mapping), id(attr_map))
+    entry = self._combined.get(key)
+    if entry is None or entry[0] is not attr_map:
+      combined = dict(mapping)
+      combined.update([(k, mapping.get(v, v)) for k, v in attr_map.items()])
+      if len(self._combined) >= self._max_combined:
+        self._combined.clear()
+      entry = self._combined[key] = (attr_map, combined)
+    return entry[1]
+
+  def apply(self, canvas, focus=False):
+    """ Apply the attributes to the CompositeCanvas canvas, like fill_attr_apply does. """
+    if self._generation != ThemeRegistry.generation:
+      self._compile()
+    mapping = self.focus_map if focus else self.normal_map
+    combine = self._combine
+    canvas.shards = [(num_rows, [cv[:4] + (combine(mapping, cv[4]),) + cv[5:] for cv in cviews]) for num_rows, cviews in canvas.shards]
+
+
+# an approximate LRU in two generations, like TextWidthCache: AttrPair, a tuple, cannot be weakly referenced
+_interned_size = 1024
+_interned_attrs = {}
+_interned_old = {}
+
+
+def _attr_key(attr):
+  if type(attr) == dict:
+    return (dict, frozenset(attr.items()))
+  return attr
+
+
+def intern_attr(attr):
+  """
+  Return the shared AttrPair for attr, an (attr, focus_attr) tuple or a single attr used for both.
+  Only the _interned_size attributes used last are sure to be kept: the AttrPair of an attribute
+  not used for longer may be built again, no more shared with the widgets using the previous one.
+  """
+  global _interned_attrs, _interned_old
+  if isinstance(attr, AttrPair):
+    return attr
+  if type(attr) != tuple:
+    attr = (attr, attr)
+  try:
+    key = (_attr_key(attr[0]), _attr_key(attr[1]))
+    pair = _interned_attrs.get(key)
+  except TypeError:  # unhashable attribute, not shared
+    return AttrPair(*attr)
+  if pair is None:
+    pair = _interned_old.pop(key, None)
+    if pair is None:
+      pair = AttrPair(*attr)
+    if len(_interned_attrs) >= _interned_size:
+      _interned_old = _interned_attrs
+      _interned_attrs = {}
+    _interned_attrs[key] = pair
+  return pair
+
+
+def _measure_width(text):
+  if '\n' in text:
+    return max(calc_width(line, 0, len(line)) for line in text.split('\n'))
+  return calc_width(text, 0, len(text))
+
+
+class TextWidthCache(object):
+  """
+  Display widths of the unicode strings sized by urwidm. Like CanvasCache, the cache is the class itself.
+  It is only enabled when urwid measures the widths in python (old_str_util, without its C extension),
+  a dict lookup being slower than the C measure.
+  It is an approximate LRU in two generations: once the recent one holds size widths it becomes
+  the old one, dropping the widths not used since. A width found in the old one moves back to the recent one.
+  """
+  enabled = urwid_util.str_util.__name__ == 'urwid.old_str_util'
+  size = 4096
+  _recent = {}
+  _old = {}
+
+  @classmethod
+  def width(cls, text):
+    """ Return the width of text, measuring it if it is not cached. """
+    width = cls._recent.get(text)
+    if width is None:
+      width = cls._old.pop(text, None)
+      if width is None:
+        width = _measure_width(text)
+      if len(cls._recent) >= cls.size:
+        cls._old = cls._recent
+        cls._recent = {}
+      cls._recent[text] = width
+    return width
+
+  @classmethod
+  def clear(cls):
+    cls._recent = {}
+    cls._old = {}
+
+
+def text_width(text):
+  """
+  Return the number of screen columns of text, of its longest line if it has several:
+  wide characters count for two, combining ones for none. Used by all the urwidm sizing code.
+  """
+  if TextWidthCache.enabled and not isinstance(text, bytes):  # the width of bytes depends on the encoding
+    return TextWidthCache.width(text)
+  return _measure_width(text)
+
+
+class ClassDefaultAttr(object):
+  """
+  Non-data descriptor returning the AttrPair for the attribute named default_name on the class.
+  Instances only store an AttrPair in their __dict__ when it differs from the class default.
+  """
+  def __init__(self, default_name):
+    self.default_name = default_name
+    self._cache = {}
+
+  def __get__(self, obj, cls):
+    try:
+      return self._cache[cls]
+    except KeyError:
+      attr = self._cache[cls] = intern_attr(getattr(cls, self.default_name))
+      return attr
+
+
+class SensitiveWidgetBehavior(object):
+  """
+  Makes an object have mutable selectivity.
+  State equal to the class defaults is not stored on the instances.
+  """
+  _sensitive = True
+  _default_sensitive_attr = ('focusable', 'focus')
+  """
+  sensitive_attr = tuple of (attr, focus_attr) when sensitive
+      attr = attribute to apply to w
+      focus_attr = attribute to apply when in focus, if None use attr
+  """
+  _default_unsensitive_attr = ('unfocusable', '')
+  """
+  unsensitive_attr = tuple of (attr, focus_attr) when not sensitive
+      attr = attribute to apply to w
+      focus_attr = attribute to apply when in focus, if None use attr
+  """
+  _sensitive_attr = ClassDefaultAttr('_default_sensitive_attr')
+  _unsensitive_attr = ClassDefaultAttr('_default_unsensitive_attr')
+  _subtree_attr_map = None
+  """ AttrPair mapping the contained widgets to their unsensitive attributes, see More.set_sensitive_subtree """
+  _handles_mouse = False
+  """ True when mouse_event handles the events itself instead of passing them to the contained widgets """
+
+  def __init__(self, state=None):
+    """
+    state = sensitive state, None for the class default
+    """
+    if state is not None:
+      self._set_override('_sensitive', state)
+
+  def _set_override(self, name, value):
+    """
+    Store value as the attribute name of this instance, unless it equals the class default.
+    """
+    if value == getattr(type(self), name):
+      self.__dict__.pop(name, None)
+    else:
+      setattr(self, name, value)
+
+  def get_sensitive_attr(self):
+    return self._sensitive_attr
+
+  def set_sensitive_attr(self, attr):
+    self._set_override('_sensitive_attr', intern_attr(attr))
+    self._invalidate()
+  sensitive_attr = property(get_sensitive_attr, set_sensitive_attr)
+
+  def get_unsensitive_attr(self):
+    return self._unsensitive_attr
+
+  def set_unsensitive_attr(self, attr):
+    self._set_override('_unsensitive_attr', intern_attr(attr))
+    self._invalidate()
+  unsensitive_attr = property(get_unsensitive_attr, set_unsensitive_attr)
+
+  def get_attr(self):
+    return (self.sensitive_attr, self.unsensitive_attr)
+
+  def set_attr(self, attr):
+    attr = intern_attr(attr)
+    self.set_sensitive_attr(attr)
+    self.set_unsensitive_attr(attr)
+  attr = property(get_attr, set_attr)
+
+  def get_sensitive(self):
+    return self._sensitive
+
+  def set_sensitive(self, state):
+    self._set_override('_sensitive', state)
+    self._invalidate()
+  sensitive = property(get_sensitive, set_sensitive)
+
+  def selectable(self):
+    return self._selectable and self.sensitive
+
+  def canvas_with_attr(self, canvas, focus=False):
+    """ Taken from AttrMap """
+    new_canvas = CompositeCanvas(canvas)
+    if self.sensitive:
+      attr_pair = self._sensitive_attr
+    elif self._subtree_attr_map is not None:
+      attr_pair = self._subtree_attr_map
+    else:
+      attr_pair = self._unsensitive_attr
+    attr_pair.apply(new_canvas, focus)
+    if self._handles_mouse:
+      # the widgets it contains get their events through it
+      drop_mouse_targets(new_canvas)
+      new_canvas.coords[(MOUSE_TARGET, id(self))] = (0, 0, weakref(new_canvas))
+    return new_canvas
+
+
+class More(FocusEventWidget, SensitiveWidgetBehavior):
+  """
+  Class that combine a FocusEventWidget and a SensitiveWidgetBehavior.
+  Parent of all other widgets defined here.
+  """
+  def __init__(self, sensitive=None):
+    SensitiveWidgetBehavior.__init__(self, sensitive)
+
+  def selectable(self):
+    """
+    Due to inheritance order, this will be the implementation of Widget,
+    pulled from FocusEventWidget that will be used.
+    So here we force to use the one from SensitiveWidgetBehavior
+    """
+    return SensitiveWidgetBehavior.selectable(self)
+
+  def _invalidate(self):
+    self.__super._invalidate()
+    FocusRing.invalidate(self)
+
+  def set_sensitive_subtree(self, state, inherit=False):
+    """
+    Set the sensitive state of this widget and of the More widgets it contains, invalidating once.
+    Widgets that are not sensitive by default, like TextMore labels, are left as is.
+    inherit: only store the state on this widget. When not sensitive, this widget maps the attributes
+             of the sensitive widgets it contains to their unsensitive attributes (the first widget
+             found wins when two of them use the same attribute).
+    """
+    widgets = list(walk_subtree(self))
+    if inherit:
+      if state:
+        self.__dict__.pop('_subtree_attr_map', None)
+      else:
+        self._subtree_attr_map = self._build_subtree_attr_map(widgets[1:])
+      self._set_override('_sensitive', state)
+      self._invalidate()
+      return
+    self.__dict__.pop('_subtree_attr_map', None)
+    for w in widgets:
+      if isinstance(w, SensitiveWidgetBehavior) and type(w)._sensitive:
+        w._set_override('_sensitive', state)
+    # the canvases of the ancestors are dropped once, so dropping the ones of the contained widgets does not cascade
+    self._invalidate()
+    for w in widgets[1:]:
+      CanvasCache.invalidate(w)
+      FocusRing.invalidate(w)
+
+  def _build_subtree_attr_map(self, widgets):
+    attr = self._unsensitive_attr[0]
+    if type(attr) == dict:
+      mapping = dict(attr)
+    else:
+      mapping = {None: attr}
+    for w in widgets:
+      if not isinstance(w, SensitiveWidgetBehavior) or not w.sensitive or w._sensitive_attr == w._unsensitive_attr:
+        continue
+      unsensitive_attr, unsensitive_focus_attr = w._unsensitive_attr
+      for key, value in zip(w._sensitive_attr, (unsensitive_attr, unsensitive_focus_attr or unsensitive_attr)):
+        if key and type(key) != dict and type(value) != dict:
+          mapping.setdefault(key, value)
+    return AttrPair(mapping, mapping)
+
+
+class TextMore(More, Text):
+  _default_sensitive_attr = ('body', 'body')
+  _sensitive = False
+  # layout defaults, only stored on the instances when they differ
+  _align_mode = LEFT
+  _wrap_mode = SPACE
+  _layout = default_layout
+
+  def __init__(self, markup, align=LEFT, wrap=SPACE, layout=None):
+    More.__init__(self)
+    Text.__init__(self, markup, align, wrap, layout)
+
+  def set_layout(self, align, wrap, layout=None):
+    """ See Text.set_layout """
+    if layout is None:
+      layout = default_layout
+    self._set_override('_layout', layout)
+    self.set_align_mode(align)
+    self.set_wrap_mode(wrap)
+
+  def set_align_mode(self, mode):
+    """ See Text.set_align_mode """
+    if not self.layout.supports_align_mode(mode):
+      raise TextError("Alignment mode {0!r} not supported.".format(mode))
+    self._set_override('_align_mode', mode)
+    self._invalidate()
+
+  def set_wrap_mode(self, mode):
+    """ See Text.set_wrap_mode """
+    if not self.layout.supports_wrap_mode(mode):
+      raise TextError("Wrap mode {0!r} not supported.".format(mode))
+    self._set_override('_wrap_mode', mode)
+    self._invalidate()
+
+  def render(self, size, focus=False):
+    return self.canvas_with_attr(self.__super.render(size, focus=focus), focus)
+
+
+class EditMore(More, Edit):
+  _default_sensitive_attr = ('focusable', 'focus_edit')
+  _selectable = True
+  _handles_mouse = True
+
+  def __init__(self, caption="", edit_text="", multiline=False, align=LEFT, wrap=SPACE, allow_tab=False, edit_pos=None, layout=None, mask=None):
+    More.__init__(self)
+    Edit.__init__(self, caption, edit_text, multiline, align, wrap, allow_tab, edit_pos, layout, mask)
+
+  def render(self, size, focus=False):
+    return self.canvas_with_attr(self.__super.render(size, focus=focus), focus)
+
+
+class IntEditMore(More, IntEdit):
+  _default_sensitive_attr = ('focusable', 'focus_edit')
+  _selectable = True
+  _handles_mouse = True
+
+  def __init__(self, caption="", default=None):
+    More.__init__(self)
+    IntEdit.__init__(self, caption, default)
+
+  def render(self, size, focus=False):
+    return self.canvas_with_attr(self.__super.render(size, focus=focus), focus)
+
+
+class _RowsCanvas(TextCanvas):
+  """ TextCanvas made of rows already rendered to maxcol, so not checked and padded again. """
+  def __init__(self, text, attr, cs, maxcol):
+    Canvas.__init__(self)
+    self._text = text
+    self._attr = attr
+    self._cs = cs
+    self._maxcol = maxcol
+    self.cursor = None
+
+
+def _move_segment(seg, offset):
+  """ Return the layout segment seg of a paragraph starting at offset in the text. """
+  if len(seg) < 2 or seg[1] is None:
+    return seg
+  if len(seg) == 3 and isinstance(seg[2], int):
+    return (seg[0], seg[1] + offset, seg[2] + offset)
+  return (seg[0], seg[1] + offset) + seg[2:]
+
+
+class BufferEditMore(EditMore):
+  """
+  Multiline EditMore keeping its text in a LineBuffer, for documents of several MB.
+  A keystroke only changes one line of the buffer, and only the edited paragraph is laid out
+  again: the layout and the rendered rows of the other paragraphs are cached.
+  edit_text joins the whole text when read. A mask keeps the newlines.
+  Unlike Edit, the 'change' signal of an edit is sent after it, and only when it is connected.
+  """
+  signals = ['change']
+  def __init__(self, caption="", edit_text="", multiline=True, align=LEFT, wrap=SPACE, allow_tab=False, edit_pos=None, layout=None, mask=None):
+    self._buffer = LineBuffer(edit_text)
+    self._layouts = {}  # paragraph -> (layout, text rows, attribute rows, charset rows)
+    self._blocks_cache = {}  # (first block, id of the block) -> rows of the block, see _block
+    self._layouts_key = None
+    self.__super.__init__(caption, edit_text, multiline, align, wrap, allow_tab, edit_pos, layout, mask)
+
+  def get_edit_text(self):
+    return self._buffer.get_text()
+
+  def set_edit_text(self, text):
+    """ See Edit.set_edit_text """
+    text = self._normalize_to_caption(text)
+    self.highlight = None
+    self._emit('change', text)
+    self._buffer = LineBuffer(text)
+    if self.edit_pos > len(text):
+      self.edit_pos = len(text)
+    self._invalidate()
+  edit_text = property(get_edit_text, set_edit_text)
+  _edit_text = property(get_edit_text)
+
+  def set_edit_pos(self, pos):
+    """ See Edit.set_edit_pos """
+    self.highlight = None
+    self.pref_col_maxcol = None, None
+    self._edit_pos = max(0, min(pos, len(self._buffer)))
+    self._invalidate()
+  edit_pos = property(lambda self: self._edit_pos, set_edit_pos)
+
+  def _replace(self, start, end, text):
+    """ Replace the edit text from start to end excluded by text. """
+    self._buffer.replace(start, end, text)
+    self.highlight = None
+    self._invalidate()
+    if getattr(self, urwid_signals._signal_attr, {}).get('change'):
+      self._emit('change', self._buffer.get_text())
+
+  def insert_text(self, text):
+    """ See Edit.insert_text """
+    text = self._normalize_to_caption(text)
+    start, end = self.highlight or (self.edit_pos, self.edit_pos)
+    self._replace(start, end, text)
+    self.set_edit_pos(start + len(text))
+
+  def _delete_highlighted(self):
+    if not self.highlight:
+      return
+    start, end = self.highlight
+    self._replace(start, end, self._caption[:0])
+    self.edit_pos = start
+    return True
+
+  def _prev_char(self, pos):
+    line, col = self._buffer.line_at(pos)
+    if col == 0:
+      return pos - 1
+    return pos - col + move_prev_char(line, 0, col)
+
+  def _next_char(self, pos):
+    line, col = self._buffer.line_at(pos)
+    if col == len(line):
+      return pos + 1
+    return pos - col + move_next_char(line, col, len(line))
+
+  def keypress(self, size, key):
+    """ Like Edit.keypress, without going through the whole text. """
+    if self.valid_char(key):
+      return self.__super.keypress(size, key)
+    p = self.edit_pos
+    if self._command_map[key] == 'cursor left':
+      if p == 0:
+        return key
+      self.set_edit_pos(self._prev_char(p))
+    elif self._command_map[key] == 'cursor right':
+      if p >= len(self._buffer):
+        return key
+      self.set_edit_pos(self._next_char(p))
+    elif key == 'backspace':
+      self.pref_col_maxcol = None, None
+      if not self._delete_highlighted():
+        if p == 0:
+          return key
+        start = self._prev_char(p)
+        self._replace(start, p, self._caption[:0])
+        self.set_edit_pos(start)
+    elif key == 'delete':
+      self.pref_col_maxcol = None, None
+      if not self._delete_highlighted():
+        if p >= len(self._buffer):
+          return key
+        self._replace(p, self._next_char(p), self._caption[:0])
+    else:
+      return self.__super.keypress(size, key)
+
+  def _check_layouts(self, maxcol):
+    """ Forget the cached paragraphs if anything but the text changed their layout. """
+    key = (maxcol, self._align_mode, self._wrap_mode, self.layout, self._mask, self._caption, tuple(self._attrib))
+    if key != self._layouts_key:
+      self._layouts_key = key
+      self._layouts = {}
+      self._blocks_cache = {}
+
+  def _paragraph_text(self, first, line):
+    """ Return (text, attr) of the paragraph line, the caption being part of the first one. """
+    if self._mask is not None:
+      line = self._mask * len(line)
+    if first:
+      return self._caption + line, self._attrib
+    return line, []
+
+  def _paragraph(self, first, line, maxcol):
+    """ Return (layout, text rows, attribute rows, charset rows) of the paragraph line, from the cache if possible. """
+    key = (line,) if first else line
+    entry = self._layouts.get(key)
+    if entry is None:
+      text, attr = self._paragraph_text(first, line)
+      trans = self.layout.layout(text, maxcol, self._align_mode, self._wrap_mode)
+      canv = urwid_apply_text_layout(text, attr, trans, maxcol)
+      entry = self._layouts[key] = (trans, canv._text, canv._attr, canv._cs)
+    return entry
+
+  def _block(self, index, block, maxcol, used=None):
+    """
+    Return (block, rows of each line, text rows, attribute rows, charset rows) of a block of the buffer,
+    from the cache if possible: the buffer replaces the blocks it changes, so the others keep their rows.
+    used: dict to which the block is added too.
+    """
+    key = (index == 0, id(block))
+    entry = self._blocks_cache.get(key)
+    if entry is None or entry[0] is not block:
+      heights = []
+      text = []
+      attr = []
+      cs = []
+      for i, line in enumerate(block):
+        trans, line_text, line_attr, line_cs = self._paragraph(index == 0 and i == 0, line, maxcol)
+        heights.append(len(trans))
+        text.extend(line_text)
+        attr.extend(line_attr)
+        cs.extend(line_cs)
+      entry = self._blocks_cache[key] = (block, heights, text, attr, cs)
+    if used is not None:
+      used[key] = entry
+    return entry
+
+  def _locate_cursor(self, maxcol, pos):
+    """
+    Return (paragraph, top row of the paragraph, x, row in the paragraph, shift) of the offset pos.
+    paragraph is (first, line), shift the number of columns to shift the row to show the cursor,
+    see Edit.get_line_translation.
+    """
+    self._check_layouts(maxcol)
+    b, i, col = self._buffer.find(pos)
+    top = 0
+    for index, block in enumerate(self._buffer.blocks()):
+      heights = self._block(index, block, maxcol)[1]
+      if index == b:
+        top += sum(heights[:i])
+        break
+      top += sum(heights)
+    paragraph = (b == 0 and i == 0, block[i])
+    trans = self._paragraph(*paragraph + (maxcol,))[0]
+    if paragraph[0]:
+      col += len(self._caption)
+    x, row = calc_coords(self._paragraph_text(*paragraph)[0], trans, col)
+    shift = 0
+    if self._shift_view_to_cursor:
+      if x < 0:
+        shift = -x
+      elif x >= maxcol:
+        shift = maxcol - 1 - x
+    return paragraph, top, x, row, shift
+
+  def position_coords(self, maxcol, pos):
+    """ See Edit.position_coords """
+    paragraph, top, x, row, shift = self._locate_cursor(maxcol, pos)
+    return x + shift, top + row
+
+  def move_cursor_to_coords(self, size, x, y):
+    """ See Edit.move_cursor_to_coords """
+    (maxcol,) = size
+    self._check_layouts(maxcol)
+    if y < 0:
+      return False
+    top = 0
+    line_index = 0
+    for index, block in enumerate(self._buffer.blocks()):
+      heights = self._block(index, block, maxcol)[1]
+      if y < top + sum(heights):
+        break
+      top += sum(heights)
+      line_index += len(block)
+    else:
+      return False
+    for i, height in enumerate(heights):
+      if y < top + height:
+        break
+      top += height
+    first = index == 0 and i == 0
+    line = block[i]
+    trans = self._paragraph(first, line, maxcol)[0]
+    pos = calc_pos(self._paragraph_text(first, line)[0], trans, x, y - top)
+    if first:
+      pos -= len(self._caption)
+    self.edit_pos = self._buffer.offset(line_index + i) + max(0, min(pos, len(line)))
+    self.pref_col_maxcol = x, maxcol
+    self._invalidate()
+    return True
+
+  def get_line_translation(self, maxcol, ta=None):
+    """ See Edit.get_line_translation, built from the cached paragraphs. """
+    self._check_layouts(maxcol)
+    trans = []
+    offset = 0
+    for i, line in enumerate(self._buffer.lines()):
+      for line_trans in self._paragraph(i == 0, line, maxcol)[0]:
+        trans.append([_move_segment(seg, offset) for seg in line_trans])
+      offset += len(self._paragraph_text(i == 0, line)[0]) + 1
+    if self._shift_view_to_cursor:
+      paragraph, top, x, row, shift = self._locate_cursor(maxcol, self.edit_pos)
+      if shift:
+        trans[top + row] = shift_line(trans[top + row], shift)
+    return trans
+
+  def rows(self, size, focus=False):
+    (maxcol,) = size
+    self._check_layouts(maxcol)
+    return sum(len(self._block(index, block, maxcol)[2]) for index, block in enumerate(self._buffer.blocks()))
+
+  def render(self, size, focus=False):
+    (maxcol,) = size
+    self._shift_view_to_cursor = bool(focus)
+    self._check_layouts(maxcol)
+    used = {}
+    text = []
+    attr = []
+    cs = []
+    for index, block in enumerate(self._buffer.blocks()):
+      block, heights, block_text, block_attr, block_cs = self._block(index, block, maxcol, used)
+      text.extend(block_text)
+      attr.extend(block_attr)
+      cs.extend(block_cs)
+    # forget the blocks and the paragraphs no longer in the text
+    self._blocks_cache = used
+    if len(self._layouts) > 2 * len(text):
+      self._layouts = {}
+    canv = _RowsCanvas(text, attr, cs, maxcol)
+    if focus:
+      paragraph, top, x, row, shift = self._locate_cursor(maxcol, self.edit_pos)
+      if shift:
+        trans = self._paragraph(*paragraph + (maxcol,))[0]
+        trans = trans[:row] + [shift_line(trans[row], shift)] + trans[row + 1:]
+        shifted = urwid_apply_text_layout(*self._paragraph_text(*paragraph) + (trans, maxcol))
+        text[top:top + len(trans)] = shifted._text
+        attr[top:top + len(trans)] = shifted._attr
+        cs[top:top + len(trans)] = shifted._cs
+      canv = CompositeCanvas(canv)
+      canv.cursor = (x + shift, top + row)
+    return self.canvas_with_attr(canv, focus)
+
+
+class WidgetWrapMore(More, WidgetWrap):
+  def __init__(self, w):
+    More.__init__(self)
+    self._wrapped_widget = w
+
+  def _render_with_attr(self, size, focus=False):
+    canvas = self._w.render(size, focus=focus)
+    return self.canvas_with_attr(CompositeCanvas(canvas), focus)
+
+  def render(self, size, focus=False):
+    return self._render_with_attr(size, focus)
+
+  def selectable(self):
+    return self._w.selectable() and self.sensitive
+
+  def _can_gain_focus(self):
+    if isinstance(self._w, FocusEventWidget):
+      return self._w._can_gain_focus()
+    else:
+      return FocusEventWidget._can_gain_focus(self)
+
+  def _can_loose_focus(self):
+    if isinstance(self._w, FocusEventWidget):
+      return self._w._can_loose_focus()
+    else:
+      return FocusEventWidget._can_loose_focus(self)
+
+  def get_focused_subwidget(self):
+    return self._w
+
+  def get_subwidgets(self):
+    return [self._w]
+
+
+class SelText(TextMore):
+  """A selectable text widget. See Text and TextMore."""
+  _default_sensitive_attr = ('focusable', 'focus_edit')
+  _selectable = True
+  _sensitive = True
+
+  def __init__(self, markup, align=LEFT, wrap=SPACE, layout=None):
+    self.__super.__init__(markup, align, wrap, layout)
+
+  def keypress(self, size, key):
+    """Don't handle any keys."""
+    return key
+
+
+class TextMultiValues(SelText):
+  """
+  A selectable text that render multiple separated values, but which only display one value
+  """
+  def __init__(self, texts, selPosition=0, join=' | ', align=LEFT, wrap=SPACE, layout=None):
+    assert texts
+    assert isinstance(texts, list)
+    assert selPosition >= 0 and selPosition < len(texts)
+    self._texts = texts
+    self._selPosition = selPosition
+    self._join = join
+    self._fullText = join.join(texts)
+    self.__super.__init__(texts[selPosition], align, wrap, layout)
+
+  def set_text(self, markup):
+    self.__super.set_text(markup)
+    if hasattr(self, "texts"):
+      self._texts[self._selPosition] = self._text
+      self._updateTexts(True)
+
+  def getTexts(self):
+    return self._texts
+
+  def setTexts(self, texts):
+    self._texts = texts
+    self._updateTexts(True)
+  texts = property(getTexts, setTexts)
+
+  def getSelPosition(self):
+    return self._selPosition
+
+  def setSelPosition(self, selPosition):
+    self._selPosition = selPosition
+    self._updateTexts(False)
+  selPosition = property(getSelPosition, setSelPosition)
+
+  def _updateTexts(self, doFull=True):
+    if doFull:
+      self._fullText = self._join.join(self._texts)
+    self._text = self._texts[self._selPosition]
+
+  def render(self, size, focus=False):
+    (maxcol,) = size
+    text = self._fullText
+    attr = self.get_text()[1]
+    trans = self.get_line_translation(maxcol, (text, attr))
+    return self.canvas_with_attr(urwid_apply_text_layout(text, attr, trans, maxcol), focus)
+
+  def _update_cache_translation(self, maxcol, ta):
+    if ta:
+      text, attr = ta
+    else:
+      text = self._fullText
+      attr = self.get_text()[1]  # noqa
+      self._cache_maxcol = maxcol
+      self._cache_translation = self._calc_line_translation(text, maxcol)
+
+  def pack(self, size=None, focus=False):
+    text = self._fullText
+    attr = self.get_text()[1]
+    if size is not None:
+      (maxcol,) = size
+      if not hasattr(self.layout, "pack"):
+        return size
+      trans = self.get_line_translation(maxcol, (text, attr))
+      cols = self.layout.pack(maxcol, trans)
+      return (cols, len(trans))
+    return (text_width(text), text.count('\n') + 1)
@@ -0,0 +1,578 @@
+#!/usr/bin/env python
+# coding: utf-8
+# vim:et:sta:sts=2:sw=2:ts=2:tw=0:
+"""
+More versions of the urwid interactive widgets, and new ones: ComboBox, OptCols.
+"""
+from __future__ import unicode_literals
+
+import re
+from urwid import SelectableIcon, Button, CheckBox, RadioButton, PopUpLauncher, Widget, Text, SolidFill, Divider, BoxAdapter, CompositeCanvas, connect_signal, CLIP
+from urwid.signals import _signals as urwid_signals
+from urwid.util import is_mouse_press as urwid_is_mouse_press
+from urwidm.futures import UIDispatcher, future_answer, is_future
+from urwidm.hotkeys import HotkeyRegistry
+from urwidm.widget import More, WidgetWrapMore, EditMore, SelText, text_width
+from urwidm.decoration import WidgetDecorationMore, AttrMapMore, FillerMore
+from urwidm.container import PileMore, ColumnsMore
+
+
+class StatesIcons(object):
+  """
+  Class attribute holding the state -> SelectableIconMore dict of a check box.
+  The icons are only built on first access, then stored on the class.
+  """
+  def __init__(self, **labels):
+    self._labels = labels
+
+  def __get__(self, instance, owner):
+    labels = dict(self._labels)
+    # keyword arguments cannot be True or False
+    states = {True: SelectableIconMore(labels.pop('checked')), False: SelectableIconMore(labels.pop('unchecked'))}
+    for state, label in labels.items():
+      states[state] = SelectableIconMore(label)
+    for cls in owner.__mro__:
+      if cls.__dict__.get('states') is self:
+        setattr(cls, 'states', states)
+        break
+    return states
+
+
+class SelectableIconMore(More, SelectableIcon):
+  _default_sensitive_attr = ('focusable', 'focus_icon')
+  _selectable = True
+
+  def __init__(self, text, cursor_position=1):
+    More.__init__(self)
+    SelectableIcon.__init__(self, text, cursor_position)
+
+  def render(self, size, focus=False):
+    return self.canvas_with_attr(self.__super.render(size, focus=focus), focus)
+
+
+class ButtonMore(More, Button):
+  _selectable = True
+  _handles_mouse = True
+
+  def __init__(self, label, on_press=None, user_data=None):
+    More.__init__(self)
+    Button.__init__(self, label, on_press, user_data)
+
+  def render(self, size, focus=False):
+    return self.canvas_with_attr(self.__super.render(size, focus=focus), focus)
+
+
+class CheckBoxMore(More, CheckBox):
+  _default_sensitive_attr = ('focusable', 'focus_radio')
+  _selectable = True
+  _handles_mouse = True
+  states = StatesIcons(checked="[X]", unchecked="[ ]", mixed="[#]")
+
+  def __init__(self, label, state=False, has_mixed=False, on_state_change=None, user_data=None):
+    More.__init__(self)
+    CheckBox.__init__(self, label, state, has_mixed, on_state_change, user_data)
+
+  def render(self, size, focus=False):
+    return self.canvas_with_attr(self.__super.render(size, focus=focus), focus)
+
+
+class RadioButtonMore(More, RadioButton):
+  _default_sensitive_attr = ('focusable', 'focus_radio')
+  _selectable = True
+  _handles_mouse = True
+  states = StatesIcons(checked="(X)", unchecked="( )", mixed="(#)")
+
+  def __init__(self, group, label, state="first True", on_state_change=None, user_data=None):
+    More.__init__(self)
+    RadioButton.__init__(self, group, label, state, on_state_change, user_data)
+
+  def render(self, size, focus=False):
+    return self.canvas_with_attr(self.__super.render(size, focus=focus), focus)
+
+
+class PopUpLauncherMore(WidgetDecorationMore, PopUpLauncher):
+  def __init__(self, original_widget):
+    WidgetDecorationMore.__init__(self, original_widget)
+    self._pop_up_widget = None
+
+  def render(self, size, focus=False):
+    canv = WidgetDecorationMore.render(self, size, focus)
+    if self._pop_up_widget:
+      canv = CompositeCanvas(canv)
+      canv.set_pop_up(self._pop_up_widget, **self.get_pop_up_parameters())
+    return canv
+
+
+class ComboBox(PopUpLauncherMore):
+  """A ComboBox of text objects"""
+  class ComboSpace(WidgetWrapMore):
+    """The actual menu-like space that comes down from the ComboBox"""
+    signals = ['close', 'validate']
+    _selectable = True
+    _handles_mouse = True
+
+    def __init__(self, items, show_first=0, item_attrs=('comboitem', 'comboitem_focus')):
+      """
+      items     : stuff to include in the combobox
+      show_first: index of the element in the list to pick first
+      """
+      normal_attr = item_attrs[0]
+      focus_attr = item_attrs[1]  # noqa
+      sepLeft = AttrMapMore(SolidFill("│"), normal_attr)
+      sepRight = AttrMapMore(SolidFill("│"), normal_attr)
+      sepBottomLeft = AttrMapMore(Text("└"), normal_attr)
+      sepBottomRight = AttrMapMore(Text("┘"), normal_attr)
+      sepBottomCenter = AttrMapMore(Divider("─"), normal_attr)
+      self._content = []
+      for item in items:
+        if isinstance(item, Widget):
+          if item.selectable and hasattr(item, "text") and hasattr(item, "attr"):  # duck typing
+            self._content.append(item)
+          else:
+            raise ValueError("items in ComboBox should be strings or selectable widget with a text and attr properties")
+        else:
+          self._content.append(SelText(item))
+      self._listw = PileMore(self._content)
+      if show_first is None:
+        show_first = 0
+      self.set_selected_pos(show_first)
+      columns = ColumnsMore([
+        ('fixed', 1, PileMore([BoxAdapter(sepLeft, len(items)), sepBottomLeft])),
+        PileMore([self._listw, sepBottomCenter]),
+        ('fixed', 1, PileMore([BoxAdapter(sepRight, len(items)), sepBottomRight])),
+      ])
+      filler = FillerMore(columns)
+      self.__super.__init__(filler)
+      self._deco = [sepLeft, sepRight, sepBottomLeft, sepBottomRight, sepBottomCenter, self._listw]
+      self._size = None
+      self.set_item_attrs(item_attrs)
+
+    def get_size(self):
+      """ Return (width, height) of the space, measured once: the items do not change once shown. """
+      if self._size is None:
+        maxw = 1
+        maxh = 0
+        for widget in self._content:
+          try:
+            (w, h) = widget.pack(())  # fixed widgets
+          except Exception:
+            try:
+              (w, h) = widget.pack(None)
+            except Exception:
+              (w, h) = (0, 0)
+          maxw = max(maxw, w + 1)
+          maxh += h
+        self._size = (maxw + 2, maxh + 1)
+      return self._size
+
+    def set_item_attrs(self, item_attrs):
+      for w in self._content:
+        if hasattr(w, "attr"):
+          w.attr = item_attrs
+      w.attr = item_attrs
+      for w in self._deco:
+        w.attr = item_attrs
+
+    def keypress(self, size, key):
+      if key in 'esc':
+        self.close()
+      if key in ('enter', ' '):
+        self.validate()
+      else:
+        return self.__super.keypress(size, key)
+
+    def mouse_event(self, size, event, button, col, row, focus):
+      ret = self.__super.mouse_event(size, event, button, col, row, focus)
+      if urwid_is_mouse_press(event) and button == 1 and col > 1 and col < size[0] - 1 and row < size[1] - 1:
+        self.validate()
+      return ret
+
+    def close(self):
+      self.set_selected_pos(None)
+      self._emit('close')
+
+    def validate(self):
+      self.set_selected_item(self._listw.get_focus())
+      self._emit('validate')
+
+    def get_selected_item(self):
+      return self._selected_item
+
+    def set_selected_item(self, item):
+      try:
+        pos = [i.text for i in self._content].index(item.text)
+      except:
+        pos = None
+      self.set_selected_pos(pos)
+    selected_item = property(get_selected_item, set_selected_item)
+
+    def get_selected_pos(self):
+      return self._selected_pos
+
+    def set_selected_pos(self, pos):
+      if pos is not None and pos < len(self._content):
+        self._listw.set_focus(pos)
+        self._selected_item = self._content[pos].text
+        self._selected_pos = pos
+      else:
+        self._selected_item = None
+        self._selected_pos = None
+    selected_pos = property(get_selected_pos, set_selected_pos)
+
+  class PendingChange(object):
+    """A selection waiting for the answers of the change handlers"""
+    def __init__(self, pos, rollback_text):
+      self.pos = pos
+      self.rollback_text = rollback_text
+      self.futures = []
+
+  _default_sensitive_attr = ('body', '')
+  _default_unsensitive_attr = ('body', '')
+  DOWN_ARROW = "↓"
+  signals = ['displaycombo', 'change']
+  _handles_mouse = True
+  change_debounce = 0
+  """ seconds without a new selection before calling the change handlers, 0 to call them at once """
+  change_timeout = 5.0
+  """ seconds to wait for the change handlers answering with a future, before rolling back """
+  _pending_change = None
+  _cached_pop_up = None
+  """ ComboSpace kept between openings, with the item texts it was built from """
+
+  def __init__(self, label='', items=None, use_enter=True, focus_index=0):
+    """
+    label       : bit of text that preceeds the combobox.  If it is "", then ignore it
+    items       : stuff to include in the combobox
+    use_enter   : does enter trigger the combo list
+    focus_index : index of the element in the list to pick first
+    """
+    self.label = Text(label)
+    if items is None:
+      items = []
+      focus_index = None
+    self.cbox = self._create_cbox_widget()
+    if label:
+      w = ColumnsMore(
+        [
+          ('fixed', text_width(label), self.label),
+          ('fixed', 1, self.cbox),
+          ('fixed', text_width(self.DOWN_ARROW), Text(self.DOWN_ARROW))
+        ], dividechars=1)
+    else:
+      w = ColumnsMore(
+        [
+          ('fixed', 1, self.cbox),
+          ('fixed', text_width(self.DOWN_ARROW), Text(self.DOWN_ARROW))
+        ], dividechars=1)
+    self.__super.__init__(w)
+    self.combo_attrs = ('comboitem', 'comboitem_focus')
+    self.use_enter = use_enter
+    self.set_list(items)
+    self.set_selected_item(focus_index)
+    self._overlay_left = 0
+    self._overlay_width = text_width(self.DOWN_ARROW)
+    self._overlay_height = len(items)
+    connect_signal(self, 'displaycombo', self.displaycombo)
+
+  def _create_cbox_widget(self):
+    return SelText('')
+
+  def _set_cbox_text(self, text):
+    ok = False
+    self.cbox._fromCombo = True  # add a property to say that we set the text from the combo
+    if not ok and hasattr(self.cbox, "set_text"):
+      try:
+        self.cbox.set_text(text)
+        ok = True
+      except:
+        pass
+    if not ok and hasattr(self.cbox, "set_edit_text"):
+      try:
+        self.cbox.set_edit_text(text)
+        ok = True
+      except:
+        pass
+    self.cbox._fromCombo = False
+    if not ok:
+      raise Exception("Do not know how to set the text in the widget {0}".format(self.cbox))
+
+  def _item_text(self, item):
+    if isinstance(item, basestring):
+      return item
+    else:
+      return item.text
+
+  def get_selected_item(self):
+    """ Return (text, index) or (text, None) if the selected text is not in the list """
+    curr_text = self.cbox.text
+    try:
+      index = [self._item_text(i) for i in self.list].index(curr_text)
+    except:
+      index = None
+    return (curr_text, index)
+
+  def set_selected_item(self, index):
+    """ Set widget focus. """
+    if index is not None and isinstance(index, int):
+      curr_text = self._item_text(self.list[index])
+    elif index is not None and isinstance(index, basestring):
+      curr_text = text
+    else:
+      curr_text = ''
+    self._set_cbox_text(curr_text)
+  selected_item = property(get_selected_item, set_selected_item)
+
+  def get_sensitive(self):
+    return self.cbox.get_sensitive()
+
+  def set_sensitive(self, state):
+    self.cbox.set_sensitive(state)
+
+  def selectable(self):
+    return self.cbox.selectable()
+
+  def get_list(self):
+    return self._list
+
+  def set_list(self, items):
+    self._list = items
+    self._cbox_width = max([text_width(self._item_text(item)) for item in self._list] or [0]) + 1
+    zonepos = 0
+    if self.label.text:
+      zonepos = 1
+    self._original_widget.column_types[zonepos] = ('fixed', self._cbox_width)
+    self._cached_pop_up = None
+  list = property(get_list, set_list)
+
+  def set_combo_attrs(self, normal_attr, focus_attr):
+    self.combo_attrs = (normal_attr, focus_attr)
+    self._cached_pop_up = None
+
+  def keypress(self, size, key):
+    """
+    If we press space or enter, be a combo box!
+    """
+    if key == ' ' or (self.use_enter and key == 'enter'):
+      self._emit("displaycombo")
+    else:
+      return self._original_widget.keypress(size, key)
+
+  def mouse_event(self, size, event, button, col, row, focus):
+    arrow = self._cbox_width + 1
+    if self.label.text:
+      arrow += text_width(self.label.text) + 1
+    if urwid_is_mouse_press(event) and button == 1 and col >= arrow and col < arrow + text_width(self.DOWN_ARROW):
+      self._emit("displaycombo")
+
+  def displaycombo(self, src):
+    self.open_pop_up()
+
+  def create_pop_up(self):
+    """
+    The ComboSpace is built on the first opening and kept: a reopening only focuses the selected item.
+    It is built again when the list, the combo attributes or the text of an item changed.
+    """
+    index = self.selected_item[1]
+    texts = tuple(self._item_text(item) for item in self.list)
+    if self._cached_pop_up and self._cached_pop_up[1] == texts:
+      popup = self._cached_pop_up[0]
+      popup.set_selected_pos(0 if index is None else index)
+    else:
+      popup = self.ComboSpace(self.list, index, self.combo_attrs)
+      connect_signal(popup, 'close', self._close_pop_up)
+      connect_signal(popup, 'validate', self.validate_pop_up)
+      self._cached_pop_up = (popup, texts)
+    self._overlay_left = 0
+    if self.label.text:
+      self._overlay_left = text_width(self.label.text)
+    (self._overlay_width, self._overlay_height) = popup.get_size()
+    return popup
+
+  def _close_pop_up(self, popup):
+    self.close_pop_up()
+
+  def get_pop_up_parameters(self):
+    return {'left': self._overlay_left, 'top': 1, 'overlay_width': self._overlay_width, 'overlay_height': self._overlay_height}
+
+  def validate_pop_up(self, popup):
+    pos = self._pop_up_widget.selected_pos
+    self.close_pop_up()
+    self.change_selection(pos)
+
+  def change_selection(self, pos):
+    """
+    Select the item at index pos if the change handlers accept it.
+    Handlers answering with a future (see urwidm.futures) do not block: the item is selected at once,
+    and the selection is rolled back if one of them refuses or does not answer within change_timeout.
+    A new selection supersedes the one still waiting for answers.
+    """
+    if self._pending_change:
+      rollback_text = self._pending_change.rollback_text
+      self._end_change(self._pending_change)
+    else:
+      rollback_text = self.cbox.text
+    change = self.PendingChange(pos, rollback_text)
+    self._pending_change = change
+    if self.change_debounce:
+      self.set_selected_item(pos)
+      UIDispatcher.call_later(self.change_debounce, self._emit_pending_change, change)
+    else:
+      self._emit_pending_change(change)
+
+  def _emit_pending_change(self, change):
+    if change is not self._pending_change:
+      return  # superseded
+    text = self._item_text(self.list[change.pos])
+    if not self._emit_change_event(text, change.pos, change.futures):
+      self._rollback_change(change)
+      return
+    self.set_selected_item(change.pos)
+    if not change.futures:
+      self._end_change(change)
+      return
+    for future in change.futures:
+      future.add_done_callback(lambda future: UIDispatcher.call_soon(self._change_answered, change, future))
+    UIDispatcher.call_later(self.change_timeout, self._change_timed_out, change)
+
+  def _change_answered(self, change, future):
+    if change is not self._pending_change or future.cancelled():
+      return
+    if not future_answer(future, 0):
+      self._rollback_change(change)
+    elif all(f.done() for f in change.futures):
+      self._end_change(change)
+
+  def _change_timed_out(self, change):
+    if change is self._pending_change:
+      self._rollback_change(change)
+
+  def _rollback_change(self, change):
+    self._end_change(change)
+    self._set_cbox_text(change.rollback_text)
+
+  def _end_change(self, change):
+    del self._pending_change  # back to the class default
+    for future in change.futures:
+      if not future.done():
+        future.cancel()
+
+  def _emit_change_event(self, pos, text, futures=None):
+    """
+    Return True if there is no callback, or if all callback answer True.
+    Answers given as futures are appended to futures, or waited for if it is None.
+    """
+    result = True
+    signal_obj = urwid_signals
+    d = getattr(self, signal_obj._signal_attr, {})
+    for callback, user_arg in d.get('change', []):
+      args = (self, pos, text)
+      answer = callback(*args)
+      if is_future(answer):
+        if futures is not None:
+          futures.append(answer)
+          continue
+        answer = future_answer(answer, self.change_timeout)
+      result &= bool(answer)
+    return result
+
+
+class ComboBoxEdit(ComboBox):
+  """
+  A ComboBox with an editable zone.
+  The combo trigger on 'enter' only, disregarding the state for self.use_enter
+  """
+  def _create_cbox_widget(self):
+    edit = EditMore(edit_text='', wrap=CLIP)
+    connect_signal(edit, 'change', self._on_edit_change)
+    return edit
+
+  def keypress(self, size, key):
+    """
+    If we press enter, be a combo box!
+    """
+    if key == 'enter':  # discard state of self.use_enter
+      self._emit("displaycombo")
+    else:
+      return self._original_widget.keypress(size, key)
+
+  def _on_edit_change(self, edit, text):
+    # prevent re-emit the change when this event has been triggered by the combo
+    if hasattr(edit, '_fromCombo') and not edit._fromCombo:
+      # we cannot prevent the edit widget from being modified, even if the combo event handlers says so
+      # so just notify about the change
+      self._emit_change_event(text, None, [])
+
+
+class OptCols(WidgetWrapMore):
+  """ Htop-style menubar on the bottom of the screen. """
+  class ClickCols(WidgetWrapMore):
+    """ Clickable menubar. """
+    _handles_mouse = True
+
+    def __init__(self, keyText, desc, attrKey, attrDesc, callback=None, keys=None):
+      items = [('fixed', text_width(keyText) + 1, Text((attrKey, keyText))), Text((attrDesc, desc))]
+      cols = ColumnsMore(items)
+      cols.attr = attrDesc
+      self.__super.__init__(cols)
+      self.callback = callback
+      self.keys = keys
+
+    def mouse_event(self, size, event, button, x, y, focus):
+      if event == "mouse press" and self.keys and len(self.keys):
+        self.callback(self.keys[0])  # the first key is used
+
+  # tuples = [((key1, key2, …), desc)], on_event gets passed a key
+  # handler = function passed the key of the "button" pressed
+  # attrs = (attr_key, attr_desc)
+  # mentions of 'left' and right will be converted to <- and -> respectively
+  def __init__(self, tuples, handler, attrs=('body', 'infobar')):
+    # Construct the texts
+    textList = []
+    # callbacks map the text contents to its assigned callback.
+    self.callbacks = []
+    for cmd in tuples:
+      keys = cmd[0]
+      if type(keys) != tuple:
+        keys = (keys,)
+      newKeys = {}
+      for key in keys:
+        newkey = reduce(lambda s, (f, t): s.replace(f, t), [
+          ('ctrl ', 'Ctrl+'),
+          ('meta ', 'Alt+'),
+          ('left', '←'),
+          ('right', '→'),
+          ('up', '↑'),
+          ('down', '↓'),
+          ('page up', 'Page Up'),
+          ('page down', 'Page Down'),
+          ('esc', 'ESC'),
+          ('enter', 'Enter')],
+          key)
+        if re.match(r"^[a-z]([0-9]*)$", newkey):
+          newkey = newkey.upper()
+        elif re.match(r".*\+.*", newkey):
+          newkey = newkey.split("+")
+          newkey = newkey[0] + "+" + newkey[1].upper()
+        newKeys[key] = newkey
+      desc = cmd[1]
+      keyText = " / ".join([newKeys[key] for key in keys]) + ":"
+      col = self.ClickCols(keyText, desc, attrs[0], attrs[1], handler, keys)
+      textList.append(col)
+    cols = ColumnsMore(textList)
+    WidgetWrapMore.__init__(self, cols)
+
+  def mouse_event(self, size, event, button, x, y, focus):
+    """ Handle mouse events. """
+    # Widgets are evenly long (as of current), so...
+    return self._w.mouse_event(size, event, button, x, y, focus)
+
+  def register_hotkeys(self, scope=None, priority=0):
+    """ Handle the keys of the bar before the widget tree, see HotkeyRegistry. """
+    for col in self._w.widget_list:
+      for key in col.keys:
+        HotkeyRegistry.register(key, col.callback, scope, priority)
+
+  def unregister_hotkeys(self, scope=None):
+    for col in self._w.widget_list:
+      for key in col.keys:
+        HotkeyRegistry.unregister(key, col.callback, scope)